@@ -0,0 +1,176 @@
+"""
+Persistent on-disk cache for Members API responses.
+
+Responses are stored in SQLite keyed by (endpoint, member id) so they survive
+Streamlit worker restarts. Each endpoint has its own TTL; once an entry is
+stale it is revalidated with If-None-Match / If-Modified-Since where the
+server gave us an ETag or Last-Modified header, and a 304 just refreshes the
+entry's timestamp.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import http_client
+
+CACHE_DIR = 'cache'
+CACHE_DB_PATH = os.path.join(CACHE_DIR, 'members_api.sqlite3')
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# How long a cached response is served without asking the server again
+ENDPOINT_TTLS = {
+    'Synopsis': 7 * DAY,
+    'Biography': 7 * DAY,
+    'Experience': 7 * DAY,
+    'Focus': 7 * DAY,
+    'Contact': 7 * DAY,
+    'RegisteredInterests': DAY,
+    'ContributionSummary': 6 * HOUR,  # changes daily
+}
+
+# Matches https://members-api.parliament.uk/api/Members/{id}/{Endpoint}
+MEMBER_URL_PATTERN = re.compile(r'^https://members-api\.parliament\.uk/api/Members/(\d+)/(\w+)$')
+
+_local = threading.local()
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from a cache row"""
+
+    def __init__(self, status_code, content, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _connection():
+    """One SQLite connection per thread (sqlite3 connections can't be shared)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                member_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, member_id)
+            )
+        """)
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def parse_member_url(url):
+    """Return (endpoint, member_id) for a cacheable Members API URL, else None"""
+    match = MEMBER_URL_PATTERN.match(url)
+    if not match or match.group(2) not in ENDPOINT_TTLS:
+        return None
+    return match.group(2), match.group(1)
+
+
+def _load(endpoint, member_id):
+    return _connection().execute(
+        'SELECT body, etag, last_modified, fetched_at FROM responses WHERE endpoint = ? AND member_id = ?',
+        (endpoint, member_id)
+    ).fetchone()
+
+
+def _store(endpoint, member_id, url, response):
+    conn = _connection()
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (endpoint, member_id, url, response.content,
+             response.headers.get('ETag'), response.headers.get('Last-Modified'), time.time())
+        )
+
+
+def _touch(endpoint, member_id):
+    conn = _connection()
+    with conn:
+        conn.execute(
+            'UPDATE responses SET fetched_at = ? WHERE endpoint = ? AND member_id = ?',
+            (time.time(), endpoint, member_id)
+        )
+
+
+def get(url, params=None, timeout=None, **kwargs):
+    """
+    Cache-aware drop-in for http_client.get.
+
+    Members API member endpoints listed in ENDPOINT_TTLS are served from the
+    cache while fresh and revalidated when stale. If revalidation fails the
+    stale copy is served rather than nothing. Any other URL goes straight to
+    http_client.get.
+    """
+    key = parse_member_url(url) if not params else None
+    if key is None:
+        return http_client.get(url, params=params, timeout=timeout, **kwargs)
+
+    endpoint, member_id = key
+    row = _load(endpoint, member_id)
+
+    if row is not None:
+        body, etag, last_modified, fetched_at = row
+        if time.time() - fetched_at < ENDPOINT_TTLS[endpoint]:
+            return CachedResponse(200, body)
+
+        # Stale: revalidate where the server gave us validators
+        headers = dict(kwargs.pop('headers', None) or {})
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        kwargs['headers'] = headers
+
+    try:
+        response = http_client.get(url, timeout=timeout, **kwargs)
+    except Exception as e:
+        if row is None:
+            raise
+        print(f"Serving stale {endpoint} for member {member_id} after error: {str(e)}")
+        return CachedResponse(200, row[0])
+
+    if response.status_code == 304 and row is not None:
+        _touch(endpoint, member_id)
+        return CachedResponse(200, row[0])
+
+    if response.status_code == 200:
+        _store(endpoint, member_id, url, response)
+        return response
+
+    if row is not None:
+        print(f"Serving stale {endpoint} for member {member_id} after status {response.status_code}")
+        return CachedResponse(200, row[0])
+
+    return response
+
+
+def invalidate(member_id=None):
+    """Drop cached responses for one member, or everything if no id is given"""
+    conn = _connection()
+    with conn:
+        if member_id is None:
+            conn.execute('DELETE FROM responses')
+        else:
+            conn.execute('DELETE FROM responses WHERE member_id = ?', (str(member_id),))
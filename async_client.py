@@ -0,0 +1,308 @@
+"""
+asyncio client for the Members, Hansard and Questions & Statements APIs.
+
+Offers the same lookups as mp_functions and hansard (get_mp_id,
+get_verified_positions, get_mp_data, search_hansard_contributions and
+get_hansard_url) on a single aiohttp session, with a semaphore bounding how
+many requests are in flight at once. Request building and response parsing
+are shared with the blocking code. Members endpoints go through api_cache
+like MPContext's, so they get the same TTLs, revalidation and stale fallback;
+since that cache is blocking, those requests run on http_client's pool.
+
+Typical batch use, many MPs in one event loop:
+
+    results = async_client.run_for_mps([4514, 172, 4212], 'get_mp_data')
+"""
+import asyncio
+from urllib.parse import urlparse
+
+import aiohttp
+
+import api_cache
+import hansard
+import hansard_links
+import http_client
+import mp_roster
+import rate_limiter
+import written_record
+from mp_functions import (
+    MP_DATA_DEADLINE,
+    MP_DATA_ENDPOINTS,
+    VERIFIED_POSITIONS_DEADLINE,
+    VERIFIED_POSITIONS_ENDPOINTS,
+    build_mp_data,
+    build_verified_positions,
+)
+
+MEMBERS_API_BASE = "https://members-api.parliament.uk/api/Members"
+SEARCH_URL = f"{MEMBERS_API_BASE}/Search"
+
+DEFAULT_CONCURRENCY = 20    # requests in flight across every host
+
+
+def encode_params(params):
+    """
+    Encode query parameters the way requests does, for aiohttp.
+
+    Booleans become 'true'/'false', lists become repeated keys and None
+    values are dropped.
+    """
+    encoded = []
+    for key, value in (params or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for item in values:
+            if item is None:
+                continue
+            if isinstance(item, bool):
+                item = 'true' if item else 'false'
+            encoded.append((key, str(item)))
+    return encoded
+
+
+class AsyncParliamentClient:
+    """
+    Bounded-concurrency asyncio client, used as an async context manager:
+
+        async with AsyncParliamentClient() as client:
+            data = await client.get_mp_data(4514)
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            headers={'User-Agent': http_client.USER_AGENT},
+            connector=aiohttp.TCPConnector(limit=self.concurrency)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+
+    async def _get(self, url, params=None, timeout=None, as_text=False):
+        """
+        GET a URL with the per-host timeout, retry policy, rate limiter and
+        circuit breaker from http_client, so sync and async fetchers share one
+        budget and one health record per host.
+
+        Returns:
+            tuple: (status, body) where body is parsed JSON (or text when
+            as_text is set) for 200 responses and None otherwise
+        """
+        host = urlparse(url).netloc
+        config = http_client.get_host_config(host)
+        limiter = http_client.get_limiter(host)
+        breaker = http_client.get_breaker(host)
+        client_timeout = aiohttp.ClientTimeout(total=timeout or config['timeout'])
+        query = encode_params(params)
+
+        is_trial = breaker.before_request()
+        try:
+            for attempt in range(config['retries'] + 1):
+                delay = limiter.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                retry_after = None
+                try:
+                    async with self._semaphore:
+                        async with self._session.get(url, params=query, timeout=client_timeout) as response:
+                            status = response.status
+                            if status == 200:
+                                body = await response.text() if as_text else await response.json(content_type=None)
+                                limiter.on_success()
+                                breaker.record_success()
+                                return status, body
+                            retry_after = rate_limiter.parse_retry_after(response.headers.get('Retry-After'))
+                except asyncio.TimeoutError:
+                    limiter.on_throttle()
+                    if attempt == config['retries']:
+                        breaker.record_failure('timeout')
+                        raise
+                    continue
+                except aiohttp.ClientError as e:
+                    if attempt == config['retries']:
+                        breaker.record_failure(e)
+                        raise
+                    await asyncio.sleep(config['backoff_factor'] * (2 ** attempt))
+                    continue
+
+                if status in rate_limiter.THROTTLE_STATUSES:
+                    limiter.on_throttle(retry_after)
+                else:
+                    limiter.on_success()
+                    if status not in http_client.RETRY_STATUSES:
+                        break
+                if attempt == config['retries']:
+                    break
+                if status in http_client.RETRY_STATUSES:
+                    await asyncio.sleep(config['backoff_factor'] * (2 ** attempt))
+
+            # 429 only means we are sending too fast; other 5xx count as failures
+            if status >= 500:
+                breaker.record_failure(f"status {status}")
+            else:
+                breaker.record_success()
+            return status, None
+        finally:
+            # Cancelled by a deadline, or failed on something that says
+            # nothing about the upstream (e.g. a JSON decode error)
+            if is_trial:
+                breaker.release_trial()
+
+    async def _get_cached(self, url, timeout=None):
+        """
+        GET a Members API URL through api_cache on http_client's pool.
+
+        Returns:
+            tuple: (status, body) like _get, with body None unless status is 200
+        """
+        kwargs = {'timeout': timeout} if timeout else {}
+        async with self._semaphore:
+            response = await asyncio.wrap_future(http_client.submit(api_cache.get, url, **kwargs))
+        if response.status_code != 200:
+            return response.status_code, None
+        return response.status_code, response.json()
+
+    async def _fetch_member_endpoints(self, mp_id, endpoints, deadline, timeouts=None):
+        """Members API endpoints for one MP under one deadline; returns (bodies, missing)"""
+        timeouts = timeouts or {}
+        tasks = {
+            asyncio.ensure_future(self._get_cached(f"{MEMBERS_API_BASE}/{mp_id}/{endpoint}", timeouts.get(endpoint))): endpoint
+            for endpoint in endpoints
+        }
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+
+        bodies = {}
+        missing = []
+        for task, endpoint in tasks.items():
+            if task not in done:
+                missing.append(endpoint)
+                continue
+            try:
+                status, body = task.result()
+                if status == 200:
+                    bodies[endpoint] = body
+                else:
+                    missing.append(endpoint)
+            except Exception as e:
+                print(f"Error fetching {endpoint} for MP {mp_id}: {str(e)}")
+                missing.append(endpoint)
+
+        return bodies, missing
+
+    async def get_mp_id(self, mp_name):
+        """Search for MP and return their ID"""
+        mp = mp_roster.find_member(mp_name)
+        if mp:
+            return mp['id']
+
+        try:
+            status, data = await self._get(SEARCH_URL, params={'Name': mp_name})
+            if status == 200 and data['items']:
+                return data['items'][0]['value']['id']
+        except Exception as e:
+            print(f"Error searching for MP: {str(e)}")
+        return None
+
+    async def get_verified_positions(self, mp_id, deadline=VERIFIED_POSITIONS_DEADLINE):
+        """Async mp_functions.get_verified_positions, sharing its cache"""
+        if not mp_id:
+            return build_verified_positions({})
+
+        bodies, missing = await self._fetch_member_endpoints(mp_id, VERIFIED_POSITIONS_ENDPOINTS, deadline)
+        return build_verified_positions(bodies, missing)
+
+    async def get_mp_data(self, mp_id, deadline=MP_DATA_DEADLINE):
+        """Async mp_functions.get_mp_data, sharing its cache"""
+        if not mp_id:
+            return build_mp_data({})
+
+        endpoints = [path for path, _ in MP_DATA_ENDPOINTS.values()]
+        timeouts = dict(MP_DATA_ENDPOINTS.values())
+        bodies, _ = await self._fetch_member_endpoints(mp_id, endpoints, deadline, timeouts)
+        return build_mp_data(bodies)
+
+    async def get_hansard_url(self, contribution_ext_id):
+        """Get the web URL for a Hansard contribution using the redirect endpoint"""
+        if not contribution_ext_id:
+            return None
+
+        try:
+            status, text = await self._get(hansard.REDIRECT_URL, params={'externalId': contribution_ext_id}, timeout=5, as_text=True)
+            if status == 200:
+                return hansard.parse_redirect_response(text)
+        except Exception as e:
+            print(f"Error getting Hansard URL for {contribution_ext_id}: {str(e)}")
+        return None
+
+    async def _run_search_request(self, search_request, warn, feeds):
+        try:
+            if search_request['kind'] in feeds:
+                # Matched against the MP's complete record in written_record
+                data = await feeds[search_request['kind']]
+                return hansard.parse_search_response(search_request, data)
+
+            status, data = await self._get(search_request['url'], params=search_request['params'])
+            if status == 200:
+                return hansard.parse_search_response(search_request, data)
+            if status != 404:
+                warn(f"{search_request['api']} returned status {status} for {search_request['type']}")
+        except asyncio.TimeoutError:
+            warn(f"Timeout searching {search_request['label']} for '{search_request['search_term']}' - API is slow, continuing with other searches")
+        except Exception as e:
+            warn(f"Error searching {search_request['label']} for '{search_request['search_term']}': {str(e)}")
+        return []
+
+    async def search_hansard_contributions(self, mp_id, search_terms, start_date=None, end_date=None, max_results=20, warn=print):
+        """
+        Async hansard.search_hansard_contributions, with every request in
+        flight at once. Written questions and statements come from
+        written_record's local store, synced once per feed on its own pool.
+        """
+        start_date, end_date = hansard.default_date_range(start_date, end_date)
+        search_requests = hansard.build_search_requests(mp_id, search_terms, start_date, end_date)
+
+        kinds = {r['kind'] for r in search_requests if r['kind'] in written_record.FEEDS}
+        feeds = {
+            kind: asyncio.ensure_future(asyncio.wrap_future(written_record.submit_load(kind, mp_id, start_date, end_date)))
+            for kind in kinds
+        }
+        batches = await asyncio.gather(*(self._run_search_request(r, warn, feeds) for r in search_requests))
+        all_results = [contribution for batch in batches for contribution in batch]
+
+        # Links are resolved lazily (see hansard_links); only stored ones are filled in here
+        return hansard_links.fill_cached(hansard.merge_results(all_results))
+
+    async def for_mps(self, mp_ids, operation, *args, **kwargs):
+        """
+        Run one client method for many MPs concurrently.
+
+        Returns:
+            dict: mp_id -> result, or None where the call raised
+        """
+        method = getattr(self, operation)
+        results = await asyncio.gather(*(method(mp_id, *args, **kwargs) for mp_id in mp_ids), return_exceptions=True)
+
+        by_mp = {}
+        for mp_id, result in zip(mp_ids, results):
+            if isinstance(result, Exception):
+                print(f"Error running {operation} for MP {mp_id}: {str(result)}")
+                result = None
+            by_mp[mp_id] = result
+        return by_mp
+
+
+def run_for_mps(mp_ids, operation, *args, concurrency=DEFAULT_CONCURRENCY, **kwargs):
+    """Blocking entry point for batch jobs: run a client method for many MPs in one event loop"""
+    async def _main():
+        async with AsyncParliamentClient(concurrency) as client:
+            return await client.for_mps(mp_ids, operation, *args, **kwargs)
+
+    return asyncio.run(_main())
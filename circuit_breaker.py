@@ -0,0 +1,122 @@
+"""
+Per-upstream circuit breakers.
+
+After a run of consecutive failures a breaker opens and every call to that
+upstream fails immediately with CircuitOpenError instead of waiting out its
+timeout. Once reset_timeout has passed a single trial request is let through
+(half-open); its outcome closes the breaker again or re-opens it. A trial
+whose outcome is never recorded is released by the caller, or expires after
+another reset_timeout, so the breaker can't stay half-open forever.
+"""
+import threading
+import time
+
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while an upstream's breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream.
+
+    Args:
+        name (str): Upstream name used in messages (usually the host)
+        failure_threshold (int): Consecutive failures that open the breaker
+        reset_timeout (float): Seconds to stay open before a trial request
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._state = CLOSED
+        self._trial_in_flight = False
+        self._trial_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """
+        Raise CircuitOpenError unless a request may be sent now.
+
+        Returns:
+            bool: True if this request is the half-open trial; the caller
+            must then record its outcome or call release_trial()
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            now = time.monotonic()
+            if self._state == OPEN and now - self.opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            trial_expired = self._trial_in_flight and now - self._trial_started >= self.reset_timeout
+            if self._state == HALF_OPEN and (not self._trial_in_flight or trial_expired):
+                self._trial_in_flight = True
+                self._trial_started = now
+                return True
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open after {self.failures} failures: {self.last_error})")
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"Circuit for {self.name} closed")
+            self._state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """End a trial whose outcome wasn't recorded (cancelled, or failed for a reason unrelated to the upstream)"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error else 'request failed'
+            if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    print(f"Circuit for {self.name} opened: {self.last_error}")
+                self._state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn through the breaker.
+
+        Exceptions carrying a 4xx status_code (bad request, auth, throttling)
+        mean the upstream is reachable and don't count as failures.
+        """
+        is_trial = self.before_request()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            status = getattr(e, 'status_code', None)
+            if status is not None and status < 500:
+                self.record_success()
+            else:
+                self.record_failure(e)
+            raise
+        finally:
+            if is_trial:
+                self.release_trial()
+        self.record_success()
+        return result
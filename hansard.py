@@ -0,0 +1,462 @@
+"""
+Hansard and Questions & Statements search.
+
+Request building and response parsing live here, separate from any I/O, so
+the blocking search used by the Streamlit app and the asyncio client in
+async_client.py produce identical results.
+"""
+import re
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed
+from datetime import datetime, timedelta
+
+import requests
+
+import http_client
+import written_record
+
+HANSARD_BASE_URL = "https://hansard-api.parliament.uk"
+QUESTIONS_BASE_URL = "https://questions-statements-api.parliament.uk"
+HANSARD_WEB_URL = "https://hansard.parliament.uk"
+
+REDIRECT_URL = f"{HANSARD_BASE_URL}/search/parlisearchredirect.json"
+
+HANSARD_ENDPOINTS = [
+    {
+        'url': f"{HANSARD_BASE_URL}/search/contributions/Spoken.json",
+        'type': 'Spoken Contribution'
+    },
+    {
+        'url': f"{HANSARD_BASE_URL}/search/writtenanswers.json",
+        'type': 'Written Answer'
+    }
+]
+
+WRITTEN_QUESTIONS_URL = f"{QUESTIONS_BASE_URL}/api/writtenquestions/questions"
+WRITTEN_STATEMENTS_URL = f"{QUESTIONS_BASE_URL}/api/writtenstatements/statements"
+
+HANSARD_TAKE = 4            # API max per type
+QUESTIONS_TAKE = 50         # Get more results to filter client-side
+MAX_MATCHES_PER_TERM = 4    # Written questions/statements kept per search term
+MIN_TEXT_LENGTH = 30
+
+# Overall budget for one search, all terms and endpoints together (seconds)
+SEARCH_DEADLINE = 30
+
+
+def default_date_range(start_date=None, end_date=None):
+    """Fill in the default search window (last 2 years)"""
+    if not start_date:
+        start_date = (datetime.now() - timedelta(days=730)).strftime('%Y-%m-%d')
+    if not end_date:
+        end_date = datetime.now().strftime('%Y-%m-%d')
+    return start_date, end_date
+
+
+def build_search_requests(mp_id, search_terms, start_date, end_date):
+    """
+    Every API request needed to search an MP's record for a set of terms.
+
+    Hansard requests are one per term and endpoint. The written questions
+    and statements feeds can't be searched by term, so each is requested
+    once and carries every term in 'search_terms' for client-side matching.
+
+    Returns:
+        list: dicts with 'kind', 'api', 'label', 'type', 'url', 'params',
+        'search_term' and (written feeds only) 'search_terms'
+    """
+    search_requests = []
+
+    # PART 1: Hansard API for spoken contributions and written answers
+    for search_term in search_terms:
+        for endpoint in HANSARD_ENDPOINTS:
+            search_requests.append({
+                'kind': 'hansard',
+                'api': 'Hansard API',
+                'label': f"Hansard {endpoint['type']}",
+                'type': endpoint['type'],
+                'url': endpoint['url'],
+                'search_term': search_term,
+                'params': {
+                    'queryParameters.searchTerm': search_term,
+                    'queryParameters.memberId': mp_id,
+                    'queryParameters.startDate': start_date,
+                    'queryParameters.endDate': end_date,
+                    'queryParameters.take': HANSARD_TAKE,
+                    'queryParameters.orderBy': 'SittingDateDesc'
+                }
+            })
+
+    # PART 2: Questions & Statements API for written questions and statements.
+    # The search term is not sent, so each feed is fetched once for all terms
+    # and filtered client-side instead.
+    search_requests.append({
+        'kind': 'written_questions',
+        'api': 'Questions API',
+        'label': 'Questions API',
+        'type': 'Written Question',
+        'url': WRITTEN_QUESTIONS_URL,
+        'search_term': ', '.join(search_terms),
+        'search_terms': list(search_terms),
+        'params': {
+            'askingMemberId': mp_id,
+            'tabledWhenFrom': start_date,
+            'tabledWhenTo': end_date,
+            'take': QUESTIONS_TAKE,
+            'house': 'Commons'
+        }
+    })
+    search_requests.append({
+        'kind': 'written_statements',
+        'api': 'Questions API',
+        'label': 'Questions API statements',
+        'type': 'Written Statement',
+        'url': WRITTEN_STATEMENTS_URL,
+        'search_term': ', '.join(search_terms),
+        'search_terms': list(search_terms),
+        'params': {
+            'members': [mp_id],  # Written statements uses array of member IDs
+            'madeWhenFrom': start_date,
+            'madeWhenTo': end_date,
+            'take': QUESTIONS_TAKE,
+            'house': 'Commons'
+        }
+    })
+
+    return search_requests
+
+
+def has_content(contribution):
+    """True if a parsed contribution has an id and more than MIN_TEXT_LENGTH of text"""
+    text = contribution['text']
+    return bool(text and len(text.strip()) > MIN_TEXT_LENGTH and contribution['id'])
+
+
+def build_term_matcher(search_terms):
+    """
+    Case-insensitive matcher for several search terms in one regex pass.
+
+    The pattern is a lookahead at every position with longer terms first,
+    so overlapping terms and terms contained in other terms ('health' in
+    'health care') are all found.
+
+    Returns:
+        callable: text -> list of the search terms found in it, in the
+        order they were given
+    """
+    terms = [(term, term.lower()) for term in dict.fromkeys(search_terms) if term and term.strip()]
+    if not terms:
+        return lambda text: []
+
+    alternatives = sorted({lowered for _, lowered in terms}, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(a) for a in alternatives) + '))', re.IGNORECASE)
+
+    def match(text):
+        found = {m.group(1).lower() for m in pattern.finditer(text or '')}
+        if not found:
+            return []
+        return [term for term, lowered in terms if any(lowered in f for f in found)]
+
+    return match
+
+
+def parse_spoken_contribution(result, search_term):
+    """Spoken contribution from a Hansard search result; 'url' is resolved separately"""
+    return {
+        'id': result.get('ContributionExtId', ''),
+        'date': result.get('SittingDate', ''),
+        'debate_title': result.get('DebateSection', 'Parliamentary Debate'),
+        'text': result.get('ContributionText', ''),
+        'full_text': result.get('ContributionTextFull', ''),
+        'member_name': result.get('MemberName', ''),
+        'hansard_section': result.get('HansardSection', ''),
+        'search_term': search_term,
+        'contribution_type': 'Spoken Contribution',
+        'house': result.get('House', 'Commons'),
+        'url': None
+    }
+
+
+def parse_written_answer(result, search_term):
+    """Written answer from a Hansard search result"""
+    return {
+        'id': result.get('Id', result.get('AnswerId', '')),
+        'date': result.get('Date', result.get('AnswerDate', '')),
+        'debate_title': f"Written Answer: {(result.get('QuestionText', result.get('Question', 'Parliamentary Question'))[:50])}...",
+        'text': result.get('AnswerText', result.get('Answer', '')),
+        'full_text': result.get('AnswerText', result.get('Answer', '')),
+        'member_name': result.get('MemberName', ''),
+        'hansard_section': result.get('Department', result.get('AnsweringDepartment', '')),
+        'search_term': search_term,
+        'contribution_type': 'Written Answer',
+        'house': result.get('House', 'Commons'),
+        'url': result.get('Url', '')
+    }
+
+
+def parse_written_question(question, search_term):
+    """Written question from a Questions & Statements API 'value' record"""
+    question_id = question.get('id', '')
+    question_text = question.get('questionText', '')
+    date_tabled = question.get('dateTabled', '')
+    uin = question.get('uin', '')
+
+    # Get member name from asking member object
+    member_name = ''
+    asking_member = question.get('askingMember', {})
+    if asking_member:
+        member_name = asking_member.get('name', asking_member.get('listAs', ''))
+
+    return {
+        'id': f"wq_{question_id}",  # Prefix to avoid ID conflicts
+        'date': date_tabled,
+        'debate_title': f"Written Question {uin}: {question_text[:50]}...",
+        'text': question_text,
+        'full_text': question_text,
+        'member_name': member_name,
+        'hansard_section': question.get('answeringBodyName', ''),
+        'search_term': search_term,
+        'contribution_type': 'Written Question',
+        'house': 'Commons',
+        'url': construct_written_question_url(date_tabled, uin)
+    }
+
+
+def parse_written_statement(statement, search_term):
+    """Written statement from a Questions & Statements API 'value' record"""
+    statement_id = statement.get('id', '')
+    title = statement.get('title', '')
+    date_made = statement.get('dateMade', '')
+    uin = statement.get('uin', '')
+
+    # Get member name
+    member_name = ''
+    member = statement.get('member', {})
+    if member:
+        member_name = member.get('name', member.get('listAs', ''))
+
+    return {
+        'id': f"ws_{statement_id}",  # Prefix to avoid ID conflicts
+        'date': date_made,
+        'debate_title': title or f"Written Statement {uin}",
+        'text': statement.get('text', ''),
+        'full_text': statement.get('text', ''),
+        'member_name': member_name,
+        'hansard_section': statement.get('answeringBodyName', ''),
+        'search_term': search_term,
+        'contribution_type': 'Written Statement',
+        'house': 'Commons',
+        'url': construct_written_statement_url(date_made, uin)
+    }
+
+
+def parse_search_response(search_request, data):
+    """
+    Turn one API response into contribution dicts.
+
+    Written questions and statements are matched client-side against all
+    of the request's search terms, as the API call doesn't include them,
+    and capped at MAX_MATCHES_PER_TERM per term.
+    """
+    search_term = search_request['search_term']
+    contributions = []
+
+    if search_request['kind'] == 'hansard':
+        parse = parse_spoken_contribution if search_request['type'] == 'Spoken Contribution' else parse_written_answer
+        for result in data.get('Results') or []:
+            contribution = parse(result, search_term)
+            # Only add if we have meaningful content and valid ID
+            if has_content(contribution):
+                contributions.append(contribution)
+        return contributions
+
+    # Each term keeps its first MAX_MATCHES_PER_TERM matches, as if it had
+    # been searched on its own; a record is labelled with the first term
+    # that kept it
+    search_terms = search_request.get('search_terms') or [search_term]
+    match_terms = build_term_matcher(search_terms)
+    matches_per_term = dict.fromkeys(search_terms, 0)
+
+    for item in data.get('results') or []:
+        # Stop if we have enough for every search term
+        if all(count >= MAX_MATCHES_PER_TERM for count in matches_per_term.values()):
+            break
+
+        value = item.get('value', {})
+        if search_request['kind'] == 'written_questions':
+            contribution = parse_written_question(value, search_term)
+            searchable_text = contribution['text']
+        else:
+            contribution = parse_written_statement(value, search_term)
+            searchable_text = f"{value.get('title', '')} {contribution['text']}"
+
+        if not value.get('id') or not has_content(contribution):
+            continue
+
+        # CLIENT-SIDE FILTERING: every term in the text, in one pass
+        kept_by = [t for t in match_terms(searchable_text) if matches_per_term[t] < MAX_MATCHES_PER_TERM]
+        for t in kept_by:
+            matches_per_term[t] += 1
+        if kept_by:
+            contribution['search_term'] = kept_by[0]
+            contributions.append(contribution)
+
+    return contributions
+
+
+def merge_results(all_results):
+    """Remove duplicates (first occurrence wins) and sort most recent first"""
+    seen_ids = set()
+    unique_results = []
+    for result in all_results:
+        result_id = str(result['id'])
+        if result_id not in seen_ids:
+            seen_ids.add(result_id)
+            unique_results.append(result)
+
+    # Sort by date (most recent first)
+    unique_results.sort(key=lambda x: x['date'], reverse=True)
+    return unique_results
+
+
+def parse_redirect_response(text):
+    """Turn a parlisearchredirect.json response body into an absolute Hansard URL"""
+    # The API returns the URL path as a string
+    hansard_path = text.strip().strip('"')
+
+    # Check if it's a relative URL (starts with /)
+    if hansard_path and hansard_path.startswith('/'):
+        return f"{HANSARD_WEB_URL}{hansard_path}"
+
+    # Check if it's already an absolute URL
+    if hansard_path and hansard_path.startswith('http'):
+        return hansard_path
+
+    # Some responses might not have the leading slash
+    if hansard_path:
+        return f"{HANSARD_WEB_URL}/{hansard_path.lstrip('/')}"
+
+    return None
+
+
+def get_hansard_url(contribution_ext_id):
+    """Get the web URL for a Hansard contribution using the redirect endpoint"""
+    try:
+        if not contribution_ext_id:
+            return None
+
+        params = {'externalId': contribution_ext_id}
+        response = http_client.get(REDIRECT_URL, params=params, timeout=5)
+
+        if response.status_code == 200:
+            return parse_redirect_response(response.text)
+
+    except Exception as e:
+        print(f"Error getting Hansard URL for {contribution_ext_id}: {str(e)}")
+
+    return None
+
+
+def _add_unique(results, seen_ids, contributions):
+    """Append contributions whose id hasn't been seen yet (first arrival wins)"""
+    for contribution in contributions:
+        result_id = str(contribution['id'])
+        if result_id not in seen_ids:
+            seen_ids.add(result_id)
+            results.append(contribution)
+
+
+def search_hansard_contributions(mp_id, search_terms, start_date=None, end_date=None, max_results=20, warn=print, deadline=SEARCH_DEADLINE):
+    """
+    Search both Hansard API and Questions & Statements API for all types of MP contributions
+
+    Every term x endpoint request is sent at once on http_client's worker
+    pool, and results are merged and de-duplicated as they arrive. Written
+    questions and statements are matched against the MP's complete record
+    for the date range, synced into written_record's local store. Whatever
+    has arrived when the overall deadline passes is returned.
+
+    Spoken contributions come back without a 'url'; hansard_links resolves
+    links for the ones the user actually adds.
+
+    Args:
+        warn (callable): Receives user-facing warning messages (st.warning in
+            the app); always called from the calling thread
+        deadline (float): Overall wall-clock budget in seconds
+    """
+    start_date, end_date = default_date_range(start_date, end_date)
+    started = time.monotonic()
+
+    futures = {}
+    for search_request in build_search_requests(mp_id, search_terms, start_date, end_date):
+        if search_request['kind'] in written_record.FEEDS:
+            future = written_record.submit_load(search_request['kind'], mp_id, start_date, end_date)
+        else:
+            future = http_client.submit(http_client.get, search_request['url'], params=search_request['params'])
+        futures[future] = search_request
+
+    all_results = []
+    seen_ids = set()
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            search_request = futures[future]
+            try:
+                response = future.result()
+
+                if search_request['kind'] in written_record.FEEDS:
+                    # Already parsed from the local store
+                    _add_unique(all_results, seen_ids, parse_search_response(search_request, response))
+                elif response.status_code == 200:
+                    _add_unique(all_results, seen_ids, parse_search_response(search_request, response.json()))
+                elif response.status_code != 404:
+                    warn(f"{search_request['api']} returned status {response.status_code} for {search_request['type']}")
+
+            except requests.exceptions.Timeout:
+                warn(f"Timeout searching {search_request['label']} for '{search_request['search_term']}' - API is slow, continuing with other searches")
+            except Exception as e:
+                warn(f"Error searching {search_request['label']} for '{search_request['search_term']}': {str(e)}")
+
+    except FuturesTimeoutError:
+        pending = [future for future in futures if not future.done()]
+        for future in pending:
+            future.cancel()
+        warn(f"Search took longer than {deadline}s - showing results found so far ({len(pending)} searches unfinished)")
+
+    print(f"Hansard search: {len(all_results)} results from {len(futures)} requests in {time.monotonic() - started:.1f}s")
+
+    # Sort by date (most recent first)
+    all_results.sort(key=lambda x: x['date'], reverse=True)
+    return all_results
+
+
+def construct_written_question_url(date_tabled, uin):
+    """Construct URL for written question based on date and UIN"""
+    if not date_tabled or not uin:
+        return ''
+
+    try:
+        # Parse date and format for URL
+        date_obj = datetime.strptime(date_tabled[:10], '%Y-%m-%d')
+        formatted_date = date_obj.strftime('%Y-%m-%d')
+
+        # Construct URL - this is the typical pattern for written questions
+        return f"https://questions-statements.parliament.uk/written-questions/detail/{formatted_date}/{uin}"
+    except:
+        return ''
+
+
+def construct_written_statement_url(date_made, uin):
+    """Construct URL for written statement based on date and UIN"""
+    if not date_made or not uin:
+        return ''
+
+    try:
+        # Parse date and format for URL
+        date_obj = datetime.strptime(date_made[:10], '%Y-%m-%d')
+        formatted_date = date_obj.strftime('%Y-%m-%d')
+
+        # Construct URL - this is the typical pattern for written statements
+        return f"https://questions-statements.parliament.uk/written-statements/detail/{formatted_date}/{uin}"
+    except:
+        return ''
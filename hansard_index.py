@@ -0,0 +1,430 @@
+"""
+Local full-text index of each MP's parliamentary record.
+
+Spoken contributions and written answers (Hansard API) and written
+questions and statements (via written_record) are stored in SQLite with an
+FTS5 index over their titles and text. start_sync() fills the index for an
+MP in the background; once a date range is covered, topic searches are
+answered locally with bm25-ranked snippets instead of another round of API
+calls. Coverage is tracked per MP and source the same way as written_record,
+so later syncs only fetch what is new.
+
+If the local SQLite build has no FTS5, is_available() is False and the app
+keeps using the remote search.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import hansard
+import http_client
+import written_record
+
+CACHE_DIR = 'cache'
+CACHE_DB_PATH = os.path.join(CACHE_DIR, 'hansard_index.sqlite3')
+
+# Source name -> how to fetch it
+HANSARD_SOURCES = {
+    'spoken': (hansard.HANSARD_ENDPOINTS[0]['url'], hansard.parse_spoken_contribution),
+    'written_answers': (hansard.HANSARD_ENDPOINTS[1]['url'], hansard.parse_written_answer),
+}
+WRITTEN_SOURCES = {
+    'written_questions': hansard.parse_written_question,
+    'written_statements': hansard.parse_written_statement,
+}
+SOURCES = list(HANSARD_SOURCES) + list(WRITTEN_SOURCES)
+
+PAGE_SIZE = 50                  # requested per page; paging steps by what the API actually returns
+MAX_SEQUENTIAL_PAGES = 100      # when the API doesn't report a total
+SYNC_DEADLINE = 120             # seconds for all pages of one source and date range
+SYNC_RETRY_INTERVAL = 5 * 60    # minimum gap before retrying a sync that didn't complete
+SYNC_PAGE_WORKERS = 2           # page requests a background sync has in flight at once
+
+# Snippet markup (Streamlit markdown) and length in tokens
+SNIPPET_START = '**'
+SNIPPET_END = '**'
+SNIPPET_ELLIPSIS = ' … '
+SNIPPET_TOKENS = 32
+
+# Separate from http_client's pool: a sync blocks while its page requests run.
+# Page requests get their own small pool too, so a sync of hundreds of pages
+# never queues ahead of interactive searches, prefetches and Wikipedia calls.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='hansard_index')
+_page_executor = ThreadPoolExecutor(max_workers=SYNC_PAGE_WORKERS, thread_name_prefix='hansard_index_page')
+
+_local = threading.local()
+_syncs = {}
+_syncs_lock = threading.Lock()
+_locks = {}
+_locks_guard = threading.Lock()
+_fts_available = None
+
+
+def _connection():
+    """One SQLite connection per thread (sqlite3 connections can't be shared)"""
+    global _fts_available
+
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                rowid INTEGER PRIMARY KEY,
+                contribution_id TEXT NOT NULL UNIQUE,
+                member_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                day TEXT NOT NULL,
+                title TEXT NOT NULL,
+                text TEXT NOT NULL,
+                body TEXT NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS items_by_member ON items (member_id, day)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS coverage (
+                source TEXT NOT NULL,
+                member_id TEXT NOT NULL,
+                covered_from TEXT NOT NULL,
+                covered_to TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (source, member_id)
+            )
+        """)
+        try:
+            # External-content FTS table kept in step with items by triggers
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+                    title, text, content='items', content_rowid='rowid', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+                    INSERT INTO items_fts(rowid, title, text) VALUES (new.rowid, new.title, new.text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+                    INSERT INTO items_fts(items_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+                    INSERT INTO items_fts(items_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+                    INSERT INTO items_fts(rowid, title, text) VALUES (new.rowid, new.title, new.text);
+                END;
+            """)
+            _fts_available = True
+        except sqlite3.OperationalError as e:
+            print(f"SQLite FTS5 not available, Hansard searches stay remote: {str(e)}")
+            _fts_available = False
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def is_available():
+    """True if the local SQLite supports the full-text index"""
+    if _fts_available is None:
+        try:
+            _connection()
+        except Exception as e:
+            print(f"Error opening Hansard index: {str(e)}")
+            return False
+    return bool(_fts_available)
+
+
+def _hansard_params(mp_id, start_date, end_date, skip):
+    return {
+        'queryParameters.memberId': mp_id,
+        'queryParameters.startDate': start_date,
+        'queryParameters.endDate': end_date,
+        'queryParameters.skip': skip,
+        'queryParameters.take': PAGE_SIZE,
+        'queryParameters.orderBy': 'SittingDateDesc'
+    }
+
+
+def _day_after(day):
+    return (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def _covered_from(results, start_date, end_date, complete):
+    """
+    Start of the date range a harvest fully covers.
+
+    Pages come newest first, so an unbroken run of pages from the first one
+    covers everything from the day after its oldest result up to end_date
+    (that oldest day may continue on the next page).
+
+    Returns:
+        str, or None if nothing was covered
+    """
+    if complete:
+        return start_date
+    days = [(r.get('SittingDate') or '')[:10] for r in results if r.get('SittingDate')]
+    if not days:
+        return None
+    return min(_day_after(min(days)), end_date)
+
+
+def harvest_hansard(source, mp_id, start_date, end_date, deadline=SYNC_DEADLINE):
+    """
+    Every spoken contribution or written answer by an MP in a date range.
+
+    The first page gives the page size the API honours and, where reported,
+    the total; the remaining pages are then fetched on this module's own
+    small page pool, so a long sync never queues ahead of interactive
+    requests on http_client's pool.
+
+    Returns:
+        tuple: (contributions, covered_from) with covered_from as in
+        _covered_from()
+    """
+    url, parse = HANSARD_SOURCES[source]
+    response = http_client.get(url, params=_hansard_params(mp_id, start_date, end_date, 0))
+    if response.status_code != 200:
+        print(f"Error harvesting {source} for {mp_id}: status {response.status_code}")
+        return [], None
+
+    data = response.json()
+    results = list(data.get('Results') or [])
+    page_size = len(results)
+    total = data.get('TotalResultCount')
+    unbroken = list(results)    # results from the unbroken run of pages starting at the first
+    complete = True
+
+    if page_size and total is not None:
+        skips = list(range(page_size, total, page_size))
+        pages = {skip: (url, {'params': _hansard_params(mp_id, start_date, end_date, skip)}) for skip in skips}
+        responses, _ = http_client.fetch_all(pages, deadline, executor=_page_executor) if pages else ({}, [])
+        for skip in skips:
+            page = responses.get(skip)
+            page_results = (page.json().get('Results') or []) if page is not None and page.status_code == 200 else None
+            if page_results is None:
+                complete = False
+                continue
+            results.extend(page_results)
+            if complete:
+                unbroken.extend(page_results)
+    elif page_size:
+        # No total: walk pages until a short one
+        started = time.monotonic()
+        skip = page_size
+        for _ in range(MAX_SEQUENTIAL_PAGES):
+            if time.monotonic() - started > deadline:
+                complete = False
+                break
+            response = http_client.get(url, params=_hansard_params(mp_id, start_date, end_date, skip))
+            if response.status_code != 200:
+                complete = False
+                break
+            page = response.json().get('Results') or []
+            results.extend(page)
+            unbroken.extend(page)
+            if len(page) < page_size:
+                break
+            skip += page_size
+        else:
+            complete = False
+
+    contributions = [parse(result, None) for result in results]
+    print(f"Harvested {len(contributions)} {source} for {mp_id} ({start_date} to {end_date}){'' if complete else ' (partial)'}")
+    return contributions, _covered_from(unbroken, start_date, end_date, complete)
+
+
+def harvest_written(source, mp_id, start_date, end_date):
+    """Written questions or statements for a date range, synced through written_record"""
+    complete = written_record.sync(source, mp_id, start_date, end_date, executor=_page_executor)
+    parse = WRITTEN_SOURCES[source]
+    records = written_record.get_records(source, mp_id, start_date, end_date)
+    contributions = [parse(record, None) for record in records if record.get('id')]
+    return contributions, start_date if complete else None
+
+
+def _store(source, mp_id, contributions):
+    rows = []
+    for contribution in contributions:
+        # Same rule as the remote search, so both paths return the same items
+        if not hansard.has_content(contribution):
+            continue
+        text = contribution['full_text'] or contribution['text']
+        rows.append((
+            str(contribution['id']), str(mp_id), source, (contribution['date'] or '')[:10],
+            contribution['debate_title'] or '', text, json.dumps(contribution)
+        ))
+
+    conn = _connection()
+    with conn:
+        conn.executemany("""
+            INSERT INTO items (contribution_id, member_id, source, day, title, text, body)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (contribution_id) DO UPDATE SET
+                day = excluded.day, title = excluded.title, text = excluded.text, body = excluded.body
+        """, rows)
+
+
+def _coverage(source, mp_id):
+    return _connection().execute(
+        'SELECT covered_from, covered_to, synced_at FROM coverage WHERE source = ? AND member_id = ?',
+        (source, str(mp_id))
+    ).fetchone()
+
+
+def sync_source(source, mp_id, start_date, end_date):
+    """
+    Bring one source of the index up to date for an MP and date range.
+
+    A harvest that only got part of the way still records the dates it
+    covered, so the next sync carries on from there instead of starting
+    over.
+
+    Returns:
+        bool: True if the range is fully covered
+    """
+    harvest = harvest_hansard if source in HANSARD_SOURCES else harvest_written
+    key = (source, str(mp_id))
+    with _locks_guard:
+        lock = _locks.setdefault(key, threading.Lock())
+
+    with lock:
+        coverage = _coverage(source, mp_id)
+
+        complete = True
+        for range_start, range_end in written_record.ranges_to_fetch(coverage, start_date, end_date):
+            contributions, covered_from = harvest(source, mp_id, range_start, range_end)
+            _store(source, mp_id, contributions)
+            if covered_from != range_start:
+                complete = False
+            if covered_from is None:
+                continue
+
+            if coverage is None:
+                coverage = (covered_from, range_end, time.time())
+            elif covered_from <= coverage[1] and range_end >= coverage[0]:
+                coverage = (min(coverage[0], covered_from), max(coverage[1], range_end), time.time())
+            else:
+                # Not contiguous with what's covered; fetched again next time
+                continue
+            conn = _connection()
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?, ?)', key + coverage)
+
+        return complete
+
+
+def sync(mp_id, start_date=None, end_date=None):
+    """Sync every source for an MP; returns True if all are fully covered"""
+    start_date, end_date = hansard.default_date_range(start_date, end_date)
+    started = time.monotonic()
+    complete = True
+    for source in SOURCES:
+        try:
+            complete = sync_source(source, mp_id, start_date, end_date) and complete
+        except Exception as e:
+            print(f"Error syncing {source} for {mp_id}: {str(e)}")
+            complete = False
+    print(f"Hansard index sync for {mp_id} {'complete' if complete else 'incomplete'} in {time.monotonic() - started:.1f}s")
+    return complete
+
+
+def start_sync(mp_id, start_date=None, end_date=None):
+    """
+    Sync an MP in the background; safe to call on every rerun.
+
+    A sync for the same MP and range is reused while it is running, and
+    not repeated until written_record.SYNC_INTERVAL has passed (or
+    SYNC_RETRY_INTERVAL if it didn't complete).
+
+    Returns:
+        Future, or None if the index is unavailable
+    """
+    if not is_available():
+        return None
+    key = (mp_id,) + hansard.default_date_range(start_date, end_date)
+    with _syncs_lock:
+        started_at, future = _syncs.get(key, (0, None))
+        if future is not None and future.done():
+            completed = future.exception() is None and future.result()
+            interval = written_record.SYNC_INTERVAL if completed else SYNC_RETRY_INTERVAL
+            if time.time() - started_at > interval:
+                future = None
+        if future is None:
+            future = _executor.submit(sync, mp_id, key[1], key[2])
+            _syncs[key] = (time.time(), future)
+        return future
+
+
+def covers(mp_id, start_date=None, end_date=None):
+    """
+    True if every source is indexed for the MP across the date range.
+
+    A range ending after the last sync still counts while that sync is
+    recent (written_record.SYNC_INTERVAL).
+    """
+    if not is_available():
+        return False
+    start_date, end_date = hansard.default_date_range(start_date, end_date)
+    for source in SOURCES:
+        coverage = _coverage(source, mp_id)
+        if coverage is None:
+            return False
+        covered_from, covered_to, synced_at = coverage
+        if covered_from > start_date:
+            return False
+        if covered_to < end_date and time.time() - synced_at > written_record.SYNC_INTERVAL:
+            return False
+    return True
+
+
+def build_match_query(search_terms):
+    """FTS5 query matching any of the terms, each as a phrase"""
+    phrases = ['"' + term.strip().replace('"', '""') + '"' for term in search_terms if term and term.strip()]
+    return ' OR '.join(phrases)
+
+
+def search(mp_id, search_terms, start_date=None, end_date=None, limit=20):
+    """
+    Ranked local search of an MP's record.
+
+    Returns:
+        list: contribution dicts as returned by the remote search, best
+        match first, each with a 'snippet' of the matching text
+    """
+    query = build_match_query(search_terms)
+    if not query or not is_available():
+        return []
+    start_date, end_date = hansard.default_date_range(start_date, end_date)
+
+    started = time.monotonic()
+    rows = _connection().execute(f"""
+        SELECT items.body, snippet(items_fts, 1, ?, ?, ?, {SNIPPET_TOKENS})
+        FROM items_fts JOIN items ON items.rowid = items_fts.rowid
+        WHERE items_fts MATCH ? AND items.member_id = ? AND items.day BETWEEN ? AND ?
+        ORDER BY bm25(items_fts)
+        LIMIT ?
+    """, (SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS, query, str(mp_id), start_date, end_date, limit)).fetchall()
+
+    match_terms = hansard.build_term_matcher(search_terms)
+    results = []
+    for body, snippet in rows:
+        contribution = json.loads(body)
+        matched = match_terms(f"{contribution['debate_title']} {contribution['full_text'] or contribution['text']}")
+        # Stemmed matches may not contain a term literally
+        contribution['search_term'] = matched[0] if matched else ', '.join(search_terms)
+        contribution['snippet'] = snippet
+        results.append(contribution)
+
+    print(f"Hansard index search for {mp_id}: {len(results)} results in {(time.monotonic() - started) * 1000:.0f}ms")
+    return results
+
+
+def invalidate(mp_id=None):
+    """Drop indexed items and coverage for one MP, or everything"""
+    conn = _connection()
+    with conn:
+        if mp_id is None:
+            conn.execute('DELETE FROM items')
+            conn.execute('DELETE FROM coverage')
+        else:
+            conn.execute('DELETE FROM items WHERE member_id = ?', (str(mp_id),))
+            conn.execute('DELETE FROM coverage WHERE member_id = ?', (str(mp_id),))
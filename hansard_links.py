@@ -0,0 +1,161 @@
+"""
+Permalinks for spoken Hansard contributions.
+
+Search results only carry a ContributionExtId; the web URL takes another
+request to parlisearchredirect.json. Links are therefore resolved lazily -
+only for the contributions the user views or adds - concurrently on
+http_client's pool, and stored in SQLite. A contribution's URL never
+changes, so each is resolved once and then shared by every session and
+process.
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import wait
+
+import http_client
+from hansard import get_hansard_url
+
+CACHE_DIR = 'cache'
+CACHE_DB_PATH = os.path.join(CACHE_DIR, 'hansard_links.sqlite3')
+
+RESOLVE_TIMEOUT = 10    # seconds to wait for a batch of links
+FAILED_RETRY_INTERVAL = 10 * 60     # seconds before re-requesting a link that didn't resolve
+
+_local = threading.local()
+_inflight = {}          # ContributionExtId -> Future, shared by concurrent callers
+_inflight_lock = threading.Lock()
+_failed = {}            # ContributionExtId -> time of the last failed attempt
+
+
+def _connection():
+    """One SQLite connection per thread (sqlite3 connections can't be shared)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS links (
+                contribution_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def _needs_link(contribution):
+    return contribution['contribution_type'] == 'Spoken Contribution' and not contribution.get('url')
+
+
+def lookup(contribution_ids):
+    """Stored URLs for the ids that have one; never makes a request"""
+    contribution_ids = [str(i) for i in contribution_ids if i]
+    if not contribution_ids:
+        return {}
+    placeholders = ','.join('?' * len(contribution_ids))
+    rows = _connection().execute(
+        f'SELECT contribution_id, url FROM links WHERE contribution_id IN ({placeholders})', contribution_ids
+    ).fetchall()
+    return dict(rows)
+
+
+def _store(urls):
+    conn = _connection()
+    with conn:
+        conn.executemany(
+            'INSERT OR REPLACE INTO links VALUES (?, ?, ?)',
+            [(contribution_id, url, time.time()) for contribution_id, url in urls.items()]
+        )
+
+
+def resolve(contribution_ids, timeout=RESOLVE_TIMEOUT):
+    """
+    URLs for a batch of contributions.
+
+    Stored links are used as they are; the rest are requested concurrently,
+    joining any request already in flight for the same id. Links still
+    outstanding after `timeout` seconds are left out (and stored once they
+    arrive), so timeout=0 only starts the requests. Ids that failed recently
+    aren't requested again until FAILED_RETRY_INTERVAL has passed.
+
+    Returns:
+        dict: ContributionExtId -> URL
+    """
+    urls = lookup(contribution_ids)
+    missing = [str(i) for i in dict.fromkeys(contribution_ids) if i and str(i) not in urls]
+    if not missing:
+        return urls
+
+    futures = {}
+    with _inflight_lock:
+        now = time.time()
+        missing = [i for i in missing if now - _failed.get(i, 0) > FAILED_RETRY_INTERVAL]
+        for contribution_id in missing:
+            future = _inflight.get(contribution_id)
+            if future is None:
+                future = http_client.submit(_resolve_one, contribution_id)
+                _inflight[contribution_id] = future
+            futures[future] = contribution_id
+
+    if not futures:
+        return urls
+
+    done, _ = wait(futures, timeout=timeout)
+    for future in done:
+        try:
+            url = future.result()
+        except Exception as e:
+            print(f"Error resolving Hansard link for {futures[future]}: {str(e)}")
+            continue
+        if url:
+            urls[futures[future]] = url
+
+    if timeout:
+        print(f"Hansard links: {len(missing)} requested, {len(done)} answered within {timeout}s")
+    return urls
+
+
+def _resolve_one(contribution_id):
+    url = None
+    try:
+        url = get_hansard_url(contribution_id)
+        if url:
+            try:
+                _store({contribution_id: url})
+            except Exception as e:
+                # Still usable for this call; it is requested again next time
+                print(f"Error storing Hansard link for {contribution_id}: {str(e)}")
+        return url
+    finally:
+        with _inflight_lock:
+            _inflight.pop(contribution_id, None)
+            if not url:
+                _failed[contribution_id] = time.time()
+
+
+def fill_cached(contributions):
+    """Set 'url' on spoken contributions whose link is already stored"""
+    pending = [c for c in contributions if _needs_link(c)]
+    urls = lookup(c['id'] for c in pending) if pending else {}
+    for contribution in pending:
+        contribution['url'] = urls.get(str(contribution['id']))
+    return contributions
+
+
+def fill(contributions, timeout=RESOLVE_TIMEOUT):
+    """
+    Set 'url' on spoken contributions, resolving any not yet stored.
+
+    With timeout=0 this never blocks: stored links are filled in and the
+    missing ones are requested in the background for a later call.
+    """
+    pending = [c for c in contributions if _needs_link(c)]
+    urls = resolve([c['id'] for c in pending], timeout) if pending else {}
+    for contribution in pending:
+        contribution['url'] = urls.get(str(contribution['id']))
+    return contributions
@@ -0,0 +1,140 @@
+"""
+Background health checks for every upstream the app depends on.
+
+A daemon thread probes each upstream through http_client (so probes share the
+rate limiters and circuit breakers, and act as the trial request that closes
+an open circuit) and publishes the results in memory. The sidebar reads
+get_status() on every rerun without touching the network.
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+import http_client
+from circuit_breaker import OPEN, HALF_OPEN
+
+PROBE_INTERVAL = 60     # seconds between probe rounds
+PROBE_TIMEOUT = 5
+SLOW_PROBE = 2.0        # seconds; slower responses are reported as degraded
+
+UP = 'up'
+DEGRADED = 'degraded'
+DOWN = 'down'
+UNKNOWN = 'unknown'
+
+UPSTREAMS = {
+    'members': {
+        'label': 'Parliament API',
+        'url': "https://members-api.parliament.uk/api/Members/Search?take=1",
+    },
+    'hansard': {
+        'label': 'Hansard API',
+        'url': "https://hansard-api.parliament.uk/overview/firstyear.json",
+    },
+    'questions': {
+        'label': 'Questions & Statements API',
+        'url': "https://questions-statements-api.parliament.uk/api/writtenquestions/questions?take=1",
+    },
+    'wikipedia': {
+        'label': 'Wikipedia',
+        'url': "https://en.wikipedia.org/w/api.php?action=query&meta=siteinfo&format=json",
+    },
+    'anthropic': {
+        # Any HTTP response (even 404) means the API is reachable
+        'label': 'Claude AI',
+        'url': "https://api.anthropic.com/",
+    },
+}
+
+_status = {
+    name: {'label': upstream['label'], 'state': UNKNOWN, 'detail': 'Not checked yet', 'checked_at': None, 'latency': None}
+    for name, upstream in UPSTREAMS.items()
+}
+_status_lock = threading.Lock()
+_monitor_thread = None
+_monitor_lock = threading.Lock()
+
+
+def host_for(name):
+    return urlparse(UPSTREAMS[name]['url']).netloc
+
+
+def probe(name):
+    """Probe one upstream and return its status dict"""
+    upstream = UPSTREAMS[name]
+    started = time.monotonic()
+    try:
+        response = http_client.get(upstream['url'], timeout=PROBE_TIMEOUT)
+        latency = time.monotonic() - started
+        if response.status_code >= 500 or response.status_code == 429:
+            state, detail = DEGRADED, f"Status {response.status_code}"
+        elif latency > SLOW_PROBE:
+            state, detail = DEGRADED, f"Slow ({latency:.1f}s)"
+        else:
+            state, detail = UP, f"{latency * 1000:.0f} ms"
+    except Exception as e:
+        latency = None
+        state, detail = DOWN, str(e)
+
+    return {'label': upstream['label'], 'state': state, 'detail': detail, 'checked_at': time.time(), 'latency': latency}
+
+
+def probe_all():
+    """Probe every upstream concurrently and publish the results"""
+    futures = {name: http_client.submit(probe, name) for name in UPSTREAMS}
+    for name, future in futures.items():
+        try:
+            result = future.result(timeout=PROBE_TIMEOUT * 3)
+        except Exception as e:
+            result = {'label': UPSTREAMS[name]['label'], 'state': DOWN, 'detail': str(e), 'checked_at': time.time(), 'latency': None}
+        with _status_lock:
+            _status[name] = result
+
+
+def get_status():
+    """
+    Latest published status of every upstream, without any network I/O.
+
+    An open circuit overrides the last probe result, so a failure seen by a
+    fetcher shows up before the next probe round.
+
+    Returns:
+        dict: name -> {'label', 'state', 'detail', 'checked_at', 'latency'}
+    """
+    with _status_lock:
+        status = {name: dict(entry) for name, entry in _status.items()}
+
+    for name, entry in status.items():
+        breaker_state = http_client.get_breaker(host_for(name)).state
+        if breaker_state == OPEN:
+            entry['state'] = DOWN
+            entry['detail'] = 'Circuit open'
+        elif breaker_state == HALF_OPEN and entry['state'] == UP:
+            entry['state'] = DEGRADED
+            entry['detail'] = 'Recovering'
+    return status
+
+
+def is_available(name):
+    """False while an upstream's circuit is open"""
+    return http_client.get_breaker(host_for(name)).state != OPEN
+
+
+def _monitor_loop():
+    while True:
+        try:
+            probe_all()
+        except Exception as e:
+            print(f"Error in health monitor: {str(e)}")
+        time.sleep(PROBE_INTERVAL)
+
+
+def start_background_monitor():
+    """Start the health monitor thread once per process (safe to call on every rerun)"""
+    global _monitor_thread
+
+    with _monitor_lock:
+        if _monitor_thread is not None:
+            return
+        _monitor_thread = threading.Thread(target=_monitor_loop, name='health_monitor', daemon=True)
+        _monitor_thread.start()
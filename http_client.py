@@ -0,0 +1,314 @@
+"""
+Shared HTTP client for every Parliament, Hansard and Wikipedia request.
+
+Each upstream host gets its own long-lived requests.Session with a keep-alive
+connection pool and a urllib3 retry policy, so repeated calls during a
+biography run reuse the same TCP/TLS connection instead of re-handshaking.
+Every request also passes through an adaptive token bucket for its host (see
+rate_limiter.py), so batch runs are paced and back off when the upstream
+throttles, and through a circuit breaker (see circuit_breaker.py) so calls to
+an upstream that is down fail immediately rather than waiting out the timeout.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import rate_limiter
+from circuit_breaker import CircuitBreaker
+from rate_limiter import THROTTLE_STATUSES
+
+USER_AGENT = 'MP_Biography_Generator (yourname@example.com)'
+
+# Defaults applied to any host not listed in HOST_CONFIG
+DEFAULT_HOST_CONFIG = {
+    'timeout': 10,          # seconds, (connect + read) per request
+    'retries': 2,           # retries for connection errors and retryable statuses
+    'backoff_factor': 0.5,  # 0.5s, 1s, 2s ... between retries
+    'pool_maxsize': 10,     # keep-alive connections kept per host
+    'rate': 5,              # starting requests per second
+    'burst': 5,             # requests allowed back to back
+    'min_rate': 0.5,        # rate floor after repeated throttling
+    'max_rate': 20,         # rate ceiling reached by additive increase
+    'rate_increase': 0.2,   # requests per second added per success
+    'failure_threshold': 5, # consecutive failures that open the circuit
+    'reset_timeout': 30,    # seconds a circuit stays open before a trial request
+}
+
+# Per-host overrides - Hansard and Questions & Statements are noticeably slower
+HOST_CONFIG = {
+    'members-api.parliament.uk': {'timeout': 10},
+    'hansard-api.parliament.uk': {'timeout': 20},
+    'questions-statements-api.parliament.uk': {'timeout': 20},
+    'en.wikipedia.org': {'timeout': 10},
+}
+
+# Retried by urllib3 (and by async_client). 429/503 are never retried by
+# urllib3: get() hands them to the rate limiter, honouring Retry-After, and
+# retries them itself
+RETRY_STATUSES = (500, 502, 504)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+# Shared worker pool for concurrent fan-out; never shut down so a caller that
+# gives up at its deadline does not block waiting for slow requests to finish
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='http_client')
+
+
+def get_host_config(host):
+    """Return the effective configuration for a host"""
+    config = dict(DEFAULT_HOST_CONFIG)
+    config.update(HOST_CONFIG.get(host, {}))
+    return config
+
+
+def configure_host(host, **settings):
+    """
+    Override timeout/retry settings for a host.
+
+    Any existing pooled session, rate limiter and circuit breaker for the
+    host are dropped so the new settings take effect on the next request.
+    """
+    with _sessions_lock:
+        HOST_CONFIG.setdefault(host, {}).update(settings)
+        session = _sessions.pop(host, None)
+    with _limiters_lock:
+        _limiters.pop(host, None)
+    with _breakers_lock:
+        _breakers.pop(host, None)
+    if session:
+        session.close()
+
+
+def _build_session(host):
+    """Create a pooled session with the retry policy for this host"""
+    config = get_host_config(host)
+
+    # Read timeouts aren't retried here, so `timeout` bounds each get() call,
+    # and Retry-After is left to get()'s limiter rather than slept on here
+    retry = Retry(
+        total=config['retries'],
+        connect=config['retries'],
+        read=0,
+        status=config['retries'],
+        backoff_factor=config['backoff_factor'],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=False,
+        raise_on_status=False,  # hand the final response back to the caller
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=config['pool_maxsize'],
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(host):
+    """Return the shared session for a host, creating it on first use"""
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _build_session(host)
+            _sessions[host] = session
+        return session
+
+
+def get_limiter(host):
+    """Return the shared rate limiter for a host, creating it on first use"""
+    limiter = _limiters.get(host)
+    if limiter is not None:
+        return limiter
+
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            config = get_host_config(host)
+            limiter = rate_limiter.TokenBucket(
+                rate=config['rate'],
+                burst=config['burst'],
+                min_rate=config['min_rate'],
+                max_rate=config['max_rate'],
+                increase=config['rate_increase'],
+            )
+            _limiters[host] = limiter
+        return limiter
+
+
+def get_breaker(host):
+    """Return the circuit breaker for a host, creating it on first use"""
+    breaker = _breakers.get(host)
+    if breaker is not None:
+        return breaker
+
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            config = get_host_config(host)
+            breaker = CircuitBreaker(
+                host,
+                failure_threshold=config['failure_threshold'],
+                reset_timeout=config['reset_timeout'],
+            )
+            _breakers[host] = breaker
+        return breaker
+
+
+def get(url, params=None, timeout=None, headers=None, **kwargs):
+    """
+    GET a URL through the pooled session and rate limiter for its host.
+
+    429 and 503 responses slow the host's limiter down (honouring any
+    Retry-After) and are retried up to the host's retry count; a timeout
+    also slows the limiter before the exception propagates.
+
+    Raises CircuitOpenError (a requests ConnectionError) without sending
+    anything while the host's circuit is open. Connection errors, timeouts
+    and 5xx responses other than throttling count towards opening it.
+
+    Args:
+        url (str): Absolute URL to fetch
+        params (dict): Optional query parameters
+        timeout (float): Overrides the per-host timeout
+        headers (dict): Extra request headers
+
+    Returns:
+        requests.Response: The final response (after any retries)
+    """
+    host = urlparse(url).netloc
+    config = get_host_config(host)
+    if timeout is None:
+        timeout = config['timeout']
+
+    session = get_session(host)
+    limiter = get_limiter(host)
+    breaker = get_breaker(host)
+    is_trial = breaker.before_request()
+    try:
+        for attempt in range(config['retries'] + 1):
+            limiter.acquire()
+            try:
+                response = session.get(url, params=params, timeout=timeout, headers=headers, **kwargs)
+            except requests.exceptions.Timeout as e:
+                limiter.on_throttle()
+                breaker.record_failure(e)
+                raise
+            except requests.exceptions.RequestException as e:
+                breaker.record_failure(e)
+                raise
+
+            if response.status_code not in THROTTLE_STATUSES:
+                limiter.on_success()
+                if response.status_code >= 500:
+                    breaker.record_failure(f"status {response.status_code}")
+                else:
+                    breaker.record_success()
+                return response
+
+            retry_after = rate_limiter.parse_retry_after(response.headers.get('Retry-After'))
+            limiter.on_throttle(retry_after)
+            print(f"{host} throttled ({response.status_code}), slowing to {limiter.rate:.1f} req/s")
+
+        # Still throttled after every retry: 503 means the service is struggling,
+        # 429 only that we are sending too fast
+        if response.status_code == 503:
+            breaker.record_failure("status 503")
+        else:
+            breaker.record_success()
+        return response
+    finally:
+        if is_trial:
+            breaker.release_trial()
+
+
+def call(host, fn, *args, **kwargs):
+    """
+    Run a non-HTTP-client call (e.g. an SDK request) through the host's circuit breaker.
+
+    Raises CircuitOpenError immediately while the host's circuit is open.
+    """
+    return get_breaker(host).call(fn, *args, **kwargs)
+
+
+def submit(fn, *args, **kwargs):
+    """Run fn on the shared worker pool and return its Future"""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def fetch_all(calls, deadline, getter=None, executor=None):
+    """
+    Run several GETs concurrently and wait at most `deadline` seconds overall.
+
+    Args:
+        calls (dict): name -> url, or name -> (url, get() keyword arguments)
+        deadline (float): Overall wall-clock budget for the whole batch
+        getter (callable): Function used for each GET, defaults to get()
+        executor (Executor): Pool to run the GETs on, defaults to the shared
+            pool; background jobs pass their own so they don't hold it up
+
+    Returns:
+        tuple: (responses, missing) where responses maps name -> Response for
+        every call that finished in time, and missing lists the names that
+        raised or were still running when the deadline expired.
+    """
+    getter = getter or get
+    executor = executor or _executor
+    started = time.monotonic()
+    futures = {}
+    for name, call in calls.items():
+        if isinstance(call, tuple):
+            url, kwargs = call
+        else:
+            url, kwargs = call, {}
+        futures[executor.submit(getter, url, **kwargs)] = name
+
+    done, not_done = wait(futures, timeout=deadline)
+
+    responses = {}
+    missing = []
+    for future in done:
+        name = futures[future]
+        try:
+            responses[name] = future.result()
+        except Exception as e:
+            print(f"Request '{name}' failed: {str(e)}")
+            missing.append(name)
+
+    for future in not_done:
+        future.cancel()
+        missing.append(futures[future])
+
+    if not_done:
+        print(f"Deadline of {deadline}s hit after {time.monotonic() - started:.1f}s, missing: {sorted(futures[f] for f in not_done)}")
+
+    return responses, missing
+
+
+def close_all():
+    """Close every pooled session (e.g. on shutdown or in tests)"""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
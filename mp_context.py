@@ -0,0 +1,111 @@
+"""
+Per-MP context shared by every stage of a biography generation.
+
+An MPContext is built once per generation from the selected MP and handed to
+positions lookup, data formatting, prompt building and DOCX rendering. Each
+Members API endpoint is requested at most once per context; concurrent
+callers asking for the same endpoint wait on the same in-flight request.
+"""
+import threading
+from concurrent.futures import wait
+
+import api_cache
+import http_client
+import portrait_store
+
+MEMBERS_API_BASE = "https://members-api.parliament.uk/api/Members"
+
+# Endpoints whose body is binary rather than JSON
+BINARY_ENDPOINTS = {'Thumbnail'}
+
+
+class MPContext:
+    """Identity of one MP plus memoised Members API responses"""
+
+    def __init__(self, mp_id, name=None, constituency=None, party=None):
+        self.mp_id = mp_id
+        self.name = name
+        self.constituency = constituency
+        self.party = party
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    @classmethod
+    def from_selected_mp(cls, selected_mp):
+        """Build a context from the app's selected_mp dict"""
+        return cls(
+            selected_mp['id'],
+            name=selected_mp.get('name'),
+            constituency=selected_mp.get('constituency'),
+            party=selected_mp.get('party')
+        )
+
+    def __repr__(self):
+        return f"MPContext({self.mp_id}, {self.name!r})"
+
+    def _submit(self, endpoint, timeout=None):
+        """Start (or reuse) the request for an endpoint; failed requests are retried"""
+        with self._lock:
+            future = self._futures.get(endpoint)
+            if future is not None and future.done():
+                try:
+                    if future.result().status_code != 200:
+                        future = None
+                except Exception:
+                    future = None
+
+            if future is None:
+                url = f"{MEMBERS_API_BASE}/{self.mp_id}/{endpoint}"
+                kwargs = {'timeout': timeout} if timeout else {}
+                future = http_client.submit(api_cache.get, url, **kwargs)
+                self._futures[endpoint] = future
+            return future
+
+    def fetch(self, endpoints, deadline, timeouts=None):
+        """
+        Fetch several Members API endpoints for this MP concurrently.
+
+        Args:
+            endpoints (list): Endpoint names, e.g. ['Synopsis', 'Biography']
+            deadline (float): Overall wall-clock budget in seconds
+            timeouts (dict): Optional per-endpoint request timeouts
+
+        Returns:
+            tuple: (bodies, missing) where bodies maps endpoint -> parsed JSON
+            (or raw bytes for binary endpoints) and missing lists endpoints
+            that failed or were still pending at the deadline.
+        """
+        timeouts = timeouts or {}
+        futures = {self._submit(endpoint, timeouts.get(endpoint)): endpoint for endpoint in endpoints}
+        done, _ = wait(futures, timeout=deadline)
+
+        bodies = {}
+        missing = []
+        for future, endpoint in futures.items():
+            if future not in done:
+                missing.append(endpoint)
+                continue
+            try:
+                response = future.result()
+                if response.status_code != 200:
+                    missing.append(endpoint)
+                elif endpoint in BINARY_ENDPOINTS:
+                    bodies[endpoint] = response.content
+                else:
+                    bodies[endpoint] = response.json()
+            except Exception as e:
+                print(f"Error fetching {endpoint} for MP {self.mp_id}: {str(e)}")
+                missing.append(endpoint)
+
+        return bodies, missing
+
+    def portrait(self, deadline=10):
+        """MP's portrait sized for the DOCX as a BytesIO, or None if unavailable"""
+        if not self.mp_id:
+            return None
+
+        def fetch_thumbnail():
+            bodies, _ = self.fetch(['Thumbnail'], deadline)
+            return bodies.get('Thumbnail')
+
+        return portrait_store.get_docx_portrait(self.mp_id, fetch_thumbnail)
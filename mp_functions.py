@@ -5,7 +5,6 @@ from docx.oxml import OxmlElement
 from docx.oxml.shared import OxmlElement
 from docx.oxml.ns import qn  # Changed from ns to qn
 from datetime import datetime
-from bs4 import BeautifulSoup
 import docx.opc.constants
 import anthropic
 import os
@@ -13,215 +12,47 @@ import PyPDF2
 import re
 import requests
 import io
-import wikipediaapi
-
-def verify_constituency_in_wikipedia(page_url, constituency):
-    """
-    Simple verification: check if constituency appears in Wikipedia page content
-    Returns True if constituency is mentioned, False otherwise
-    """
-    try:
-        import requests
-        from bs4 import BeautifulSoup
-
-        response = requests.get(page_url, timeout=10)
-        if response.status_code != 200:
-            return False
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        content = soup.get_text().lower()
-
-        # Check for constituency (handle common variations)
-        constituency_lower = constituency.lower()
-        constituency_variations = [
-            constituency_lower,
-            constituency_lower.replace(' and ', ' & '),
-            constituency_lower.replace(' & ', ' and '),
-        ]
-
-        for variation in constituency_variations:
-            if variation in content:
-                return True
-
-        return False
-
-    except Exception as e:
-        print(f"Error verifying constituency: {str(e)}")
-        return False
-
+import threading
+import time
+import http_client
+import mp_roster
+import wiki_resolver
+from mp_context import MPContext
 
 def get_mp_wiki_link_verified(mp_name, constituency):
     """
     Enhanced version of get_mp_wiki_link that verifies constituency
-    - Uses the same search logic as before
-    - Adds constituency verification for found pages
-    - Future-proof: doesn't rely on specific election years
+    (see wiki_resolver.find_page)
     """
     try:
-        import requests
-        from bs4 import BeautifulSoup
-
-        print(f"Searching for Wikipedia page: {mp_name} (constituency: {constituency})")
-
-        # Use generic "List of MPs" page (not year-specific)
-        potential_matches = []
-
-        # Try current parliament list first
-        list_urls = [
-            "https://en.wikipedia.org/wiki/List_of_MPs_elected_in_the_2024_United_Kingdom_general_election",
-            "https://en.wikipedia.org/wiki/List_of_current_members_of_the_British_Parliament"
-        ]
-
-        name_parts = mp_name.lower().split()
-        first_name = name_parts[0] if name_parts else ""
-        last_name = name_parts[-1] if len(name_parts) > 1 else name_parts[0] if name_parts else ""
-
-        for list_url in list_urls:
-            try:
-                response = requests.get(list_url, timeout=10)
-                if response.status_code != 200:
-                    continue
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-                tables = soup.find_all('table', class_='wikitable')
-
-                for table in tables:
-                    for link in table.find_all('a'):
-                        href = link.get('href', '')
-                        if not href.startswith('/wiki/'):
-                            continue
-
-                        # Skip obvious non-MP pages
-                        if any(x in href.lower() for x in [
-                            'constituency', 'party', 'election', 'parliament', 'list_of', 'category:'
-                        ]):
-                            continue
-
-                        link_text = link.get_text().strip().lower()
-
-                        # Simple name matching (same as before)
-                        if (mp_name.lower() in link_text or
-                            (first_name in link_text and last_name in link_text) or
-                            (last_name in link_text and len(last_name) > 4)):
-
-                            full_url = f"https://en.wikipedia.org{href}"
-                            if full_url not in [m['url'] for m in potential_matches]:
-                                potential_matches.append({
-                                    'url': full_url,
-                                    'text': link.get_text().strip()
-                                })
-
-            except Exception as e:
-                print(f"Error searching {list_url}: {str(e)}")
-                continue
-
-        print(f"Found {len(potential_matches)} potential Wikipedia matches")
-
-        # Now verify each match has the constituency
-        for match in potential_matches:
-            print(f"Checking: {match['text']} -> {match['url']}")
-
-            if verify_constituency_in_wikipedia(match['url'], constituency):
-                print(f"✅ VERIFIED: Constituency '{constituency}' found in {match['text']}")
-                return match['url']
-            else:
-                print(f"❌ REJECTED: Constituency '{constituency}' not found in {match['text']}")
-
-        print(f"❌ No verified Wikipedia page found for {mp_name} in {constituency}")
-        return None
-
+        url, _ = wiki_resolver.find_page(mp_name, constituency)
+        return url
     except Exception as e:
         print(f"Error in Wikipedia search: {str(e)}")
         return None
 
 
-def get_wiki_data_verified(mp_name, constituency, max_chars=3500):
+def get_wiki_data_verified(mp_name, constituency, max_tokens=wiki_resolver.DEFAULT_TOKEN_BUDGET):
     """
     Enhanced version of get_wiki_data with constituency verification
-    - Same content extraction logic as before
-    - Uses verified Wikipedia URL
+    - Uses the memoised verified page from wiki_resolver
     """
-    try:
-        print(f"Getting verified Wikipedia data for: {mp_name}")
-
-        # Get verified Wikipedia URL
-        wiki_url = get_mp_wiki_link_verified(mp_name, constituency)
-
-        if not wiki_url:
-            print("No verified Wikipedia page found")
-            return None
-
-        # Extract page title from URL
-        page_title = wiki_url.split('/')[-1].replace('_', ' ')
-        print(f"Using verified Wikipedia page: {page_title}")
-
-        # Get content using Wikipedia API (same as original function)
-        import wikipediaapi
-
-        wiki = wikipediaapi.Wikipedia(
-            user_agent='MP_Biography_Generator (yourname@example.com)',
-            language='en'
-        )
-
-        page = wiki.page(page_title)
-
-        if not page.exists():
-            print(f"Page does not exist in Wikipedia API: {page_title}")
-            return None
-
-        # Get content (exactly same logic as original get_wiki_data function)
-        content = page.summary
-        print(f"Summary length: {len(content)} characters")
-
-        # Add important sections (same as original)
-        important_sections = [
-            'early life', 'education', 'background', 'career', 'personal life',
-            'political career', 'parliamentary career', 'political views',
-            'controversies', 'awards', 'publications'
-        ]
-
-        essential_added = False
-        for section in page.sections:
-            section_title_lower = section.title.lower()
-
-            if any(x in section_title_lower for x in ['see also', 'references', 'external links', 'notes', 'bibliography']):
-                continue
-
-            is_important = any(imp in section_title_lower for imp in important_sections)
-
-            if is_important:
-                section_text = f"\n\n{section.title}\n{section.text}"
-                if len(content) + len(section_text) <= max_chars:
-                    content += section_text
-                    essential_added = True
-                    print(f"Added section: {section.title}")
-
-        # Add other sections if room (same logic as original)
-        if not essential_added or len(content) < max_chars * 0.7:
-            for section in page.sections:
-                section_title_lower = section.title.lower()
-
-                if (any(imp in section_title_lower for imp in important_sections) or
-                    any(x in section_title_lower for x in ['see also', 'references', 'external links', 'notes', 'bibliography'])):
-                    continue
-
-                section_text = f"\n\n{section.title}\n{section.text}"
-                if len(content) + len(section_text) <= max_chars:
-                    content += section_text
-
-        print(f"Final verified content length: {len(content)} characters")
-        return content
-
-    except Exception as e:
-        print(f"Error in verified Wikipedia data retrieval: {str(e)}")
+    wiki = wiki_resolver.resolve(mp_name, constituency)
+    if not wiki:
+        print("No verified Wikipedia page found")
         return None
 
+    content = wiki.build_content(max_tokens)
+    print(f"Final verified content length: {len(content)} characters")
+    return content
+
 
 def get_wiki_url_verified(mp_name, constituency):
     """
     Simple wrapper to get verified Wikipedia URL
     """
-    return get_mp_wiki_link_verified(mp_name, constituency)
+    wiki = wiki_resolver.resolve(mp_name, constituency)
+    return wiki.url if wiki else None
 
 
 def search_perplexity(mp_name, issues, api_key):
@@ -376,10 +207,15 @@ def clean_text(text):
 
 def get_mp_id(mp_name):
     """Search for MP and return their ID"""
+    # Resolve against the local Commons roster first
+    mp = mp_roster.find_member(mp_name)
+    if mp:
+        return mp['id']
+
     try:
         # Make API request to search for MP
-        search_url = f"https://members-api.parliament.uk/api/Members/Search?Name={mp_name}"
-        response = requests.get(search_url)
+        search_url = "https://members-api.parliament.uk/api/Members/Search"
+        response = http_client.get(search_url, params={'Name': mp_name})
         if response.status_code == 200:
             data = response.json()
             if data['items'] and len(data['items']) > 0:
@@ -388,128 +224,162 @@ def get_mp_id(mp_name):
         print(f"Error searching for MP: {str(e)}")
     return None
 
-def get_verified_positions(mp_id):
-    """Get verified data from Parliament API with debug output"""
+# Host of the Anthropic API, used for its circuit breaker
+ANTHROPIC_HOST = 'api.anthropic.com'
+
+# Members API endpoints behind get_verified_positions
+VERIFIED_POSITIONS_ENDPOINTS = ['Synopsis', 'ContributionSummary', 'Biography']
+
+# Overall budget for the Synopsis/ContributionSummary/Biography fan-out
+VERIFIED_POSITIONS_DEADLINE = 12
+
+# How long get_cached_verified_positions reuses a result (seconds). Partial
+# results are kept briefly so a recovering API is retried soon.
+VERIFIED_POSITIONS_TTL = 15 * 60
+PARTIAL_POSITIONS_TTL = 60
+
+_positions_cache = {}   # mp_id -> (expires_at, verified_data)
+_positions_locks = {}
+_positions_guard = threading.Lock()
+
+
+def _empty_verified_positions():
+    return {
+        'current_committees': [],
+        'historical_committees': [],
+        'current_roles': [],
+        'historical_roles': [],
+        'synopsis': None,
+        'recent_contributions': None,
+        'api_response': None,
+        'partial': False,
+        'missing_sections': []
+    }
+
+
+def build_verified_positions(bodies, missing=()):
+    """
+    Build the verified_data dict from Members API response bodies.
+
+    Args:
+        bodies (dict): Parsed JSON keyed by endpoint ('Synopsis',
+            'ContributionSummary', 'Biography'); absent keys are skipped
+        missing (list): Endpoints that failed or missed the deadline
+    """
+    verified_data = _empty_verified_positions()
+    verified_data['missing_sections'] = sorted(missing)
+    verified_data['partial'] = bool(missing)
+
+    # Synopsis
+    if 'Synopsis' in bodies:
+        synopsis_data = bodies['Synopsis']
+        if 'value' in synopsis_data:
+            verified_data['synopsis'] = synopsis_data['value']
+            print(f"DEBUG: Synopsis found: {len(verified_data['synopsis'])} characters")
+
+    # Contribution summary
+    if 'ContributionSummary' in bodies:
+        contributions_data = bodies['ContributionSummary']
+        if 'items' in contributions_data and contributions_data['items']:
+            # Get most recent contributions (last 30 days)
+            recent_contributions = {
+                'total_count': 0,
+                'recent_debates': []
+            }
+
+            for item in contributions_data['items'][:5]:  # Look at 5 most recent
+                contribution = item['value']
+                recent_contributions['total_count'] += contribution.get('totalContributions', 0)
+                recent_contributions['recent_debates'].append({
+                    'title': contribution.get('debateTitle'),
+                    'date': contribution.get('sittingDate'),
+                    'contributions': contribution.get('totalContributions', 0)
+                })
+
+            verified_data['recent_contributions'] = recent_contributions
+            print(f"DEBUG: Found {len(contributions_data['items'])} contribution items")
+
+    # Biography
+    if 'Biography' in bodies:
+        print("DEBUG: Biography request successful, processing data...")
+        bio_data = bodies['Biography']['value']
+        verified_data['api_response'] = bio_data
+        print(f"DEBUG: Biography data keys: {list(bio_data.keys())}")
+
+        # Process committee memberships - they're under 'committeeMemberships' directly
+        if bio_data.get('committeeMemberships'):
+            print(f"DEBUG: Found {len(bio_data['committeeMemberships'])} committee memberships")
+            for committee in bio_data['committeeMemberships']:
+                committee_info = {
+                    'name': committee.get('name'),
+                    'start_date': committee.get('startDate', '')[:10] if committee.get('startDate') else None,
+                    'end_date': committee.get('endDate', '')[:10] if committee.get('endDate') else 'present'
+                }
+
+                # Check if current or historical based on endDate
+                if not committee.get('endDate'):
+                    verified_data['current_committees'].append(committee_info)
+                else:
+                    verified_data['historical_committees'].append(committee_info)
+
+        # Process government posts
+        if bio_data.get('governmentPosts'):
+            print(f"DEBUG: Found {len(bio_data['governmentPosts'])} government posts")
+            for post in bio_data['governmentPosts']:
+                post_info = {
+                    'name': post.get('name'),
+                    'start_date': post.get('startDate', '')[:10] if post.get('startDate') else None,
+                    'end_date': post.get('endDate', '')[:10] if post.get('endDate') else 'present'
+                }
+
+                if not post.get('endDate'):
+                    verified_data['current_roles'].append(post_info)
+                else:
+                    verified_data['historical_roles'].append(post_info)
+
+        # Process opposition posts
+        if bio_data.get('oppositionPosts'):
+            print(f"DEBUG: Found {len(bio_data['oppositionPosts'])} opposition posts")
+            for post in bio_data['oppositionPosts']:
+                post_info = {
+                    'name': post.get('name'),
+                    'start_date': post.get('startDate', '')[:10] if post.get('startDate') else None,
+                    'end_date': post.get('endDate', '')[:10] if post.get('endDate') else 'present'
+                }
+
+                if not post.get('endDate'):
+                    verified_data['current_roles'].append(post_info)
+                else:
+                    verified_data['historical_roles'].append(post_info)
+
+    return verified_data
+
+
+def get_verified_positions(mp_id, deadline=VERIFIED_POSITIONS_DEADLINE, context=None):
+    """
+    Get verified data from Parliament API with debug output
+
+    Synopsis, ContributionSummary and Biography are fetched concurrently under
+    a single overall deadline. If any of them fails or misses the deadline the
+    result is still returned, with 'partial' set to True and the missing
+    sections listed under 'missing_sections'.
+
+    Pass the generation's MPContext to reuse responses it already holds.
+    """
     print(f"DEBUG: Starting get_verified_positions for MP ID: {mp_id}")
 
     try:
-        verified_data = {
-            'current_committees': [],
-            'historical_committees': [],
-            'current_roles': [],
-            'historical_roles': [],
-            'synopsis': None,
-            'recent_contributions': None,
-            'api_response': None
-        }
-
         if not mp_id:
             print("DEBUG: No MP ID provided")
-            return verified_data
-
-        print("DEBUG: About to fetch synopsis...")
-        # Get synopsis
-        synopsis_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Synopsis"
-        print(f"DEBUG: Calling synopsis URL: {synopsis_url}")
-        synopsis_response = requests.get(synopsis_url, timeout=10)
-        print(f"DEBUG: Synopsis response: {synopsis_response.status_code}")
-
-        if synopsis_response.status_code == 200:
-            synopsis_data = synopsis_response.json()
-            if 'value' in synopsis_data:
-                verified_data['synopsis'] = synopsis_data['value']
-                print(f"DEBUG: Synopsis found: {len(verified_data['synopsis'])} characters")
-
-        print("DEBUG: Synopsis completed, moving to contributions...")
-
-        # Get contribution summary
-        print("DEBUG: About to fetch contribution summary...")
-        contributions_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/ContributionSummary"
-        print(f"DEBUG: Calling contributions URL: {contributions_url}")
-        contributions_response = requests.get(contributions_url, timeout=10)
-        print(f"DEBUG: Contributions response: {contributions_response.status_code}")
-
-        if contributions_response.status_code == 200:
-            contributions_data = contributions_response.json()
-            if 'items' in contributions_data and contributions_data['items']:
-                # Get most recent contributions (last 30 days)
-                recent_contributions = {
-                    'total_count': 0,
-                    'recent_debates': []
-                }
+            return _empty_verified_positions()
 
-                for item in contributions_data['items'][:5]:  # Look at 5 most recent
-                    contribution = item['value']
-                    recent_contributions['total_count'] += contribution.get('totalContributions', 0)
-                    recent_contributions['recent_debates'].append({
-                        'title': contribution.get('debateTitle'),
-                        'date': contribution.get('sittingDate'),
-                        'contributions': contribution.get('totalContributions', 0)
-                    })
-
-                verified_data['recent_contributions'] = recent_contributions
-                print(f"DEBUG: Found {len(contributions_data['items'])} contribution items")
-
-        print("DEBUG: Contributions completed, moving to biography...")
-
-        # Get biography
-        bio_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Biography"
-        print(f"DEBUG: Calling biography URL: {bio_url}")
-        bio_response = requests.get(bio_url, timeout=10)
-        print(f"DEBUG: Biography response: {bio_response.status_code}")
-
-        if bio_response.status_code == 200:
-            print("DEBUG: Biography request successful, processing data...")
-            bio_data = bio_response.json()['value']
-            verified_data['api_response'] = bio_data
-            print(f"DEBUG: Biography data keys: {list(bio_data.keys())}")
-
-            # Process committee memberships - they're under 'committeeMemberships' directly
-            if bio_data.get('committeeMemberships'):
-                print(f"DEBUG: Found {len(bio_data['committeeMemberships'])} committee memberships")
-                for committee in bio_data['committeeMemberships']:
-                    committee_info = {
-                        'name': committee.get('name'),
-                        'start_date': committee.get('startDate', '')[:10] if committee.get('startDate') else None,
-                        'end_date': committee.get('endDate', '')[:10] if committee.get('endDate') else 'present'
-                    }
-
-                    # Check if current or historical based on endDate
-                    if not committee.get('endDate'):
-                        verified_data['current_committees'].append(committee_info)
-                    else:
-                        verified_data['historical_committees'].append(committee_info)
-
-            # Process government posts
-            if bio_data.get('governmentPosts'):
-                print(f"DEBUG: Found {len(bio_data['governmentPosts'])} government posts")
-                for post in bio_data['governmentPosts']:
-                    post_info = {
-                        'name': post.get('name'),
-                        'start_date': post.get('startDate', '')[:10] if post.get('startDate') else None,
-                        'end_date': post.get('endDate', '')[:10] if post.get('endDate') else 'present'
-                    }
-
-                    if not post.get('endDate'):
-                        verified_data['current_roles'].append(post_info)
-                    else:
-                        verified_data['historical_roles'].append(post_info)
-
-            # Process opposition posts
-            if bio_data.get('oppositionPosts'):
-                print(f"DEBUG: Found {len(bio_data['oppositionPosts'])} opposition posts")
-                for post in bio_data['oppositionPosts']:
-                    post_info = {
-                        'name': post.get('name'),
-                        'start_date': post.get('startDate', '')[:10] if post.get('startDate') else None,
-                        'end_date': post.get('endDate', '')[:10] if post.get('endDate') else 'present'
-                    }
-
-                    if not post.get('endDate'):
-                        verified_data['current_roles'].append(post_info)
-                    else:
-                        verified_data['historical_roles'].append(post_info)
+        context = context or MPContext(mp_id)
+        print(f"DEBUG: Fetching {', '.join(VERIFIED_POSITIONS_ENDPOINTS)} concurrently (deadline {deadline}s)")
+        bodies, missing = context.fetch(VERIFIED_POSITIONS_ENDPOINTS, deadline)
+        verified_data = build_verified_positions(bodies, missing)
 
+        if verified_data['partial']:
+            print(f"DEBUG: Partial result, missing: {verified_data['missing_sections']}")
         print(f"DEBUG: Function completed successfully. Found {len(verified_data['current_committees'])} current committees, {len(verified_data['current_roles'])} current roles")
         return verified_data
 
@@ -517,75 +387,131 @@ def get_verified_positions(mp_id):
         print(f"DEBUG: Error in get_verified_positions: {str(e)}")
         import traceback
         print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        verified_data = _empty_verified_positions()
+        verified_data['partial'] = True
         return verified_data
 
-def get_mp_portrait(mp_id):
+
+def get_cached_verified_positions(mp_id, context=None):
+    """
+    get_verified_positions memoised per member id, shared across sessions.
+
+    The sidebar calls this on every Streamlit rerun and generation calls it
+    again, so only the first caller within VERIFIED_POSITIONS_TTL hits the
+    Members API; concurrent callers for the same MP wait for that one fetch.
+    """
+    if not mp_id:
+        return get_verified_positions(mp_id)
+
+    cached = _positions_cache.get(mp_id)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
+    with _positions_guard:
+        lock = _positions_locks.setdefault(mp_id, threading.Lock())
+
+    with lock:
+        cached = _positions_cache.get(mp_id)
+        if cached and cached[0] > time.time():
+            return cached[1]
+
+        verified_data = get_verified_positions(mp_id, context=context)
+        ttl = PARTIAL_POSITIONS_TTL if verified_data.get('partial') else VERIFIED_POSITIONS_TTL
+        _positions_cache[mp_id] = (time.time() + ttl, verified_data)
+        return verified_data
+
+
+def clear_verified_positions_cache(mp_id=None):
+    """Forget cached positions for one MP, or for everyone"""
+    if mp_id is None:
+        _positions_cache.clear()
+    else:
+        _positions_cache.pop(mp_id, None)
+
+def get_mp_portrait(mp_id, context=None):
     """Get MP's thumbnail image"""
     if not mp_id:
         return None
 
     try:
-        thumbnail_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Thumbnail"
-        response = requests.get(thumbnail_url)
-        if response.status_code == 200:
-            return io.BytesIO(response.content)
+        context = context or MPContext(mp_id)
+        return context.portrait()
     except Exception as e:
         print(f"Error getting MP thumbnail: {str(e)}")
     return None
 
-def get_mp_data(mp_id):
-    """Get comprehensive MP data from various API endpoints"""
+# Members API endpoints used by get_mp_data: data key -> (path, per-request timeout)
+MP_DATA_ENDPOINTS = {
+    'biography': ('Biography', 10),
+    'experience': ('Experience', 10),
+    'interests': ('RegisteredInterests', 15),  # can be a large payload
+    'focus': ('Focus', 10),
+    'contact': ('Contact', 10),
+}
+
+# Overall budget for the get_mp_data fan-out
+MP_DATA_DEADLINE = 15
+
+
+def build_mp_data(bodies):
+    """
+    Build the get_mp_data dict from Members API response bodies.
+
+    Args:
+        bodies (dict): Parsed JSON keyed by endpoint path (see MP_DATA_ENDPOINTS);
+            sections whose endpoint is absent are listed under 'missing_sections'
+    """
     data = {
         'biography': None,
         'experience': None,
         'interests': None,
         'focus': None,
         'committees': None,
-        'contact': None
+        'contact': None,
+        'missing_sections': []
     }
 
+    missing = []
+    for key, (path, _) in MP_DATA_ENDPOINTS.items():
+        if path in bodies:
+            data[key] = bodies[path]['value']
+        else:
+            missing.append(key)
+
+    # Get committee memberships from biography if available
+    if data['biography']:
+        data['committees'] = data['biography'].get('committeeMemberships', [])
+
+    data['missing_sections'] = sorted(missing)
+    return data
+
+
+def get_mp_data(mp_id, deadline=MP_DATA_DEADLINE, context=None):
+    """
+    Get comprehensive MP data from various API endpoints
+
+    All endpoints are requested concurrently. Whatever has arrived when the
+    deadline expires is returned; sections that failed or are still pending
+    are listed under 'missing_sections'. Pass the generation's MPContext to
+    reuse responses it already holds.
+    """
     if not mp_id:
-        return data
+        return build_mp_data({})
 
     try:
-        # Get biography
-        bio_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Biography"
-        bio_response = requests.get(bio_url)
-        if bio_response.status_code == 200:
-            data['biography'] = bio_response.json()['value']
-
-        # Get experience
-        exp_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Experience"
-        exp_response = requests.get(exp_url)
-        if exp_response.status_code == 200:
-            data['experience'] = exp_response.json()['value']
-
-        # Get registered interests
-        interests_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/RegisteredInterests"
-        interests_response = requests.get(interests_url)
-        if interests_response.status_code == 200:
-            data['interests'] = interests_response.json()['value']
-
-        # Get focus areas
-        focus_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Focus"
-        focus_response = requests.get(focus_url)
-        if focus_response.status_code == 200:
-            data['focus'] = focus_response.json()['value']
-
-        # Get committee memberships from biography if available
-        if data['biography']:
-            data['committees'] = data['biography'].get('committeeMemberships', [])
-
-        # Get contact information
-        contact_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Contact"
-        contact_response = requests.get(contact_url)
-        if contact_response.status_code == 200:
-            data['contact'] = contact_response.json()['value']
+        context = context or MPContext(mp_id)
+        endpoints = [path for path, _ in MP_DATA_ENDPOINTS.values()]
+        timeouts = dict(MP_DATA_ENDPOINTS.values())
+        bodies, _ = context.fetch(endpoints, deadline, timeouts)
+        data = build_mp_data(bodies)
+
+        if data['missing_sections']:
+            print(f"MP data incomplete for {mp_id}, missing: {', '.join(data['missing_sections'])}")
+        return data
 
     except Exception as e:
         print(f"Error fetching MP data: {str(e)}")
-
-    return data
+        return build_mp_data({})
 
 def format_mp_data(mp_data):
     """Format MP data into structured text"""
@@ -710,61 +636,10 @@ def find_mp_in_wikipedia_list(mp_name):
         mp_name (str): The name of the MP to search for
 
     Returns:
-        wikipediaapi.WikipediaPage or None: The Wikipedia page for the MP if found
+        wiki_resolver.WikiResult or None: The Wikipedia page for the MP if found
     """
     try:
-        wiki = wikipediaapi.Wikipedia(
-            user_agent='MP_Biography_Generator (yourname@example.com)',
-            language='en'
-        )
-
-        # Get the list of MPs page
-        list_page = wiki.page("List_of_MPs_elected_in_the_2024_United_Kingdom_general_election")
-
-        if not list_page.exists():
-            print("MPs list page not found on Wikipedia")
-            return None
-
-        # Get all the links from the list page
-        links = list_page.links
-
-        # Normalize the MP name for matching (lowercase, no extra spaces)
-        mp_name_norm = " ".join(mp_name.strip().lower().split())
-        mp_surname = mp_name.strip().split()[-1].lower()
-
-        # List to store potential matches
-        potential_matches = []
-
-        # Search through the links for potential MP matches
-        for title, page in links.items():
-            # Skip disambiguation, category, and list pages
-            if any(x in title for x in ['List of', 'Category:', 'disambiguation', 'election']):
-                continue
-
-            # Skip pages about constituencies, parties, etc.
-            if any(x in title.lower() for x in ['constituency', 'party', 'general election']):
-                continue
-
-            # Check if the title contains the MP's name
-            if mp_name_norm in title.lower() or mp_surname in title.lower():
-                potential_matches.append((title, page))
-
-        print(f"Found {len(potential_matches)} potential matches for {mp_name}")
-
-        # If we have potential matches, prioritize them by likelihood
-        if potential_matches:
-            # Check if any match contains "MP" or "politician"
-            for title, page in potential_matches:
-                if " MP" in title or "(politician)" in title:
-                    print(f"Selected match with MP/politician indicator: {title}")
-                    return page
-
-            # If no matches with MP/politician indicators, use the first match
-            print(f"Selected first potential match: {potential_matches[0][0]}")
-            return potential_matches[0][1]
-
-        return None
-
+        return wiki_resolver.resolve(mp_name)
     except Exception as e:
         print(f"Error finding MP in Wikipedia list: {str(e)}")
         return None
@@ -780,196 +655,45 @@ def get_mp_wiki_link(mp_name):
         str or None: The Wikipedia URL if found, None otherwise
     """
     try:
-        print(f"Searching for MP: {mp_name} in the 2024 elected MPs list")
-
-        # Get the list page
-        url = "https://en.wikipedia.org/wiki/List_of_MPs_elected_in_the_2024_United_Kingdom_general_election"
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Error accessing MPs list page: Status code {response.status_code}")
-            return None
-
-        # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Normalize the MP name for more flexible matching
-        name_parts = mp_name.lower().split()
-        first_name = name_parts[0] if name_parts else ""
-        last_name = name_parts[-1] if len(name_parts) > 1 else name_parts[0] if name_parts else ""
-
-        # Find all MP links in the tables - typically they're in wikitable class tables
-        mp_links = []
-        tables = soup.find_all('table', class_='wikitable')
-
-        for table in tables:
-            for link in table.find_all('a'):
-                # Skip links with certain patterns
-                if any(x in link.get('href', '').lower() for x in [
-                    'constituency', 'party', 'election', 'parliament', 'list_of', 'category:'
-                ]):
-                    continue
-
-                link_text = link.get_text().strip().lower()
-
-                # Different matching strategies
-                if (mp_name.lower() in link_text or                           # Full name match
-                    (first_name in link_text and last_name in link_text) or   # First and last name in text
-                    last_name in link_text):                                  # Last name at minimum
-
-                    href = link.get('href')
-                    if href and href.startswith('/wiki/'):
-                        mp_links.append({
-                            'text': link.get_text().strip(),
-                            'url': f"https://en.wikipedia.org{href}",
-                            'exact_match': mp_name.lower() == link_text
-                        })
-
-        # Print all potential matches for debugging
-        print(f"Found {len(mp_links)} potential matches:")
-        for i, link in enumerate(mp_links):
-            print(f"{i+1}. {link['text']} - {link['url']}")
-
-        # First try exact matches
-        exact_matches = [link for link in mp_links if link['exact_match']]
-        if exact_matches:
-            print(f"Using exact match: {exact_matches[0]['text']} - {exact_matches[0]['url']}")
-            return exact_matches[0]['url']
-
-        # Then try best match (first match)
-        if mp_links:
-            print(f"Using best match: {mp_links[0]['text']} - {mp_links[0]['url']}")
-            return mp_links[0]['url']
-
-        print(f"No matches found for {mp_name}")
-        return None
-
+        url, _ = wiki_resolver.find_page(mp_name)
+        return url
     except Exception as e:
         print(f"Error finding MP Wikipedia link: {str(e)}")
         return None
 
 
-def get_wiki_data(mp_name, max_chars=3500):
-    """Get comprehensive MP data from Wikipedia with length control"""
-    try:
-        print(f"\nAttempting to find Wikipedia data for: {mp_name}")
-
-        # First try to get the direct link from the MPs list
-        mp_wiki_url = get_mp_wiki_link(mp_name)
-
-        if not mp_wiki_url:
-            print("Could not find MP in the 2024 elected MPs list")
-            return None
-
-        # Extract page title from URL
-        page_title = mp_wiki_url.split('/')[-1].replace('_', ' ')
-        print(f"Found Wikipedia page: {page_title}")
-
-        # Use the Wikipedia API to get full content
-        wiki = wikipediaapi.Wikipedia(
-            user_agent='MP_Biography_Generator (yourname@example.com)',
-            language='en'
-        )
-
-        # Get the page using the API
-        page = wiki.page(page_title)
-
-        if not page.exists():
-            print(f"Page does not exist in Wikipedia API: {page_title}")
-            return None
-
-        print(f"Successfully loaded page: {page.title}")
-
-        # Get the full summary first
-        content = page.summary
-        print(f"Summary length: {len(content)} characters")
-
-        # Define important biographical sections to prioritize
-        important_sections = [
-            'early life', 'education', 'background', 'career', 'personal life',
-            'political career', 'parliamentary career', 'political views',
-            'controversies', 'awards', 'publications'
-        ]
-
-        # Add essential sections first
-        essential_added = False
-        for section in page.sections:
-            section_title_lower = section.title.lower()
-
-            # Skip irrelevant sections
-            if any(x in section_title_lower for x in ['see also', 'references', 'external links', 'notes', 'bibliography']):
-                continue
-
-            # Check if this is an important biographical section
-            is_important = any(imp in section_title_lower for imp in important_sections)
-
-            # Add important sections first
-            if is_important:
-                section_text = f"\n\n{section.title}\n{section.text}"
-
-                # Check if adding this section would exceed max length
-                if len(content) + len(section_text) <= max_chars:
-                    content += section_text
-                    essential_added = True
-                    print(f"Added important section: {section.title} ({len(section_text)} chars)")
-
-        # If we have room, add other sections that weren't important but might be relevant
-        if not essential_added or len(content) < max_chars * 0.7:
-            for section in page.sections:
-                section_title_lower = section.title.lower()
-
-                # Skip already processed important sections and irrelevant ones
-                if (any(imp in section_title_lower for imp in important_sections) or
-                    any(x in section_title_lower for x in ['see also', 'references', 'external links', 'notes', 'bibliography'])):
-                    continue
-
-                section_text = f"\n\n{section.title}\n{section.text}"
-
-                # Check if adding this section would exceed max length
-                if len(content) + len(section_text) <= max_chars:
-                    content += section_text
-                    print(f"Added additional section: {section.title} ({len(section_text)} chars)")
-
-        # Add subsections if we still have room
-        if len(content) < max_chars * 0.9:
-            for section in page.sections:
-                for subsection in section.sections:
-                    subsection_title_lower = subsection.title.lower()
-
-                    # Skip irrelevant subsections
-                    if any(x in subsection_title_lower for x in ['see also', 'references', 'external links', 'notes']):
-                        continue
-
-                    subsection_text = f"\n\n{section.title} - {subsection.title}\n{subsection.text}"
-
-                    # Check if adding this subsection would exceed max length
-                    if len(content) + len(subsection_text) <= max_chars:
-                        content += subsection_text
-                        print(f"Added subsection: {subsection.title} ({len(subsection_text)} chars)")
-
-        # Log summary of what we found
-        print(f"Total content length: {len(content)} characters")
-        print(f"Content sections: {content.count('\\n\\n')}")
-
-        if len(content) < 500:
-            print("WARNING: Retrieved content is very short. Content may be incomplete.")
-
-        return content
-
-    except Exception as e:
-        print(f"Error fetching Wikipedia data: {str(e)}")
+def get_wiki_data(mp_name, max_tokens=wiki_resolver.DEFAULT_TOKEN_BUDGET):
+    """Get comprehensive MP data from Wikipedia within a token budget (name match only)"""
+    wiki = wiki_resolver.resolve(mp_name)
+    if not wiki:
+        print(f"Could not find {mp_name} in the Wikipedia MP index")
         return None
 
+    content = wiki.build_content(max_tokens)
+    print(f"Total content length: {len(content)} characters")
+    if len(content) < 500:
+        print("WARNING: Retrieved content is very short. Content may be incomplete.")
+    return content
+
 def get_wiki_url(mp_name):
     """Get Wikipedia URL for MP"""
-    try:
-        return get_mp_wiki_link(mp_name)
-    except Exception as e:
-        print(f"Error getting Wikipedia URL: {str(e)}")
-        return None
+    wiki = wiki_resolver.resolve(mp_name)
+    return wiki.url if wiki else None
 
 
 # UPDATED GENERATE_BIOGRAPHY FUNCTION (mp_functions.py)
-def generate_biography(mp_name, input_content, examples, verified_positions=None, comments=None, length_setting="medium"):
+def generate_biography(mp_name, input_content, examples, verified_positions=None, comments=None, length_setting="medium", context=None, wiki=None, sources=None):
+    """
+    Generate the biography text with Claude.
+
+    context is the generation's MPContext and wiki its resolved WikiResult,
+    if available; without wiki the page is resolved (memoised) here.
+
+    sources is a SourceResults from source_providers.run_providers. When
+    given, positions, Wikipedia and comments missing from the arguments are
+    taken from it and nothing is fetched here - a source that missed its
+    deadline is simply left out of the prompt.
+    """
     # Validate and clean inputs (keep your existing logic)
     if isinstance(input_content, list):
         input_content = ' '.join(str(x) for x in input_content)
@@ -979,14 +703,33 @@ def generate_biography(mp_name, input_content, examples, verified_positions=None
     input_content = str(input_content).strip()
     examples = str(examples).strip()
 
+    if sources is not None:
+        if not input_content:
+            input_content = sources.notes_text() or sources.get('pdf') or ''
+        if verified_positions is None:
+            verified_positions = sources.get('verified_positions')
+        if wiki is None:
+            wiki = sources.get('wikipedia')
+        if comments is None:
+            comments = sources.comments()
+
     if not input_content:
         input_content = f"Background information for {mp_name} could not be found. Further research is needed."
 
     # Get Wikipedia data as fallback
-    wiki_content = get_wiki_data(mp_name)
-    if wiki_content:
+    if wiki is None and sources is None:
+        if context is not None and context.constituency:
+            wiki = wiki_resolver.resolve(context.name or mp_name, context.constituency)
+        else:
+            wiki = wiki_resolver.resolve(mp_name)
+    wiki_content = wiki.content if wiki else None
+    if wiki_content and wiki_content not in input_content:
         input_content = f"{input_content}\n\nWikipedia information:\n{wiki_content}"
 
+    # Positions come from the shared context when the caller didn't pass them
+    if verified_positions is None and sources is None and context is not None and context.mp_id:
+        verified_positions = get_cached_verified_positions(context.mp_id, context=context)
+
     client = anthropic.Client(api_key=os.getenv('ANTHROPIC_API_KEY'))
     current_date = datetime.now().strftime('%Y-%m-%d')
 
@@ -1183,7 +926,9 @@ def generate_biography(mp_name, input_content, examples, verified_positions=None
             "comprehensive": 4500
         }
 
-        response = client.messages.create(
+        response = http_client.call(
+            ANTHROPIC_HOST,
+            client.messages.create,
             model="claude-sonnet-4-20250514",  # Updated to Sonnet 4
             max_tokens=max_tokens_map.get(length_setting, 3000),
             temperature=0.7,
@@ -1284,8 +1029,15 @@ def apply_body_style(paragraph):
 # QUICK FIX: Add these lines at the VERY START of your save_biography function
 # (Right after the function definition, before anything else)
 
-def save_biography(mp_name, content, comments=None, has_pdf=False, has_api_data=False, has_wiki_data=False, wiki_url=None):
-    """Save biography with hyperlinks - SIMPLE DEBUG VERSION"""
+def save_biography(mp_name, content, comments=None, has_pdf=False, has_api_data=False, has_wiki_data=False, wiki_url=None, context=None, wiki=None):
+    """Save biography with hyperlinks - SIMPLE DEBUG VERSION
+
+    Pass the generation's MPContext so the MP id and portrait are not looked up
+    again, and its WikiResult to source the Wikipedia link from it.
+    """
+    if wiki is not None:
+        has_wiki_data = True
+        wiki_url = wiki_url or wiki.url
 
     # SIMPLE DEBUG - Add these lines at the start
     print(f"\n🚀 SAVE_BIOGRAPHY CALLED for {mp_name}")
@@ -1392,9 +1144,11 @@ def save_biography(mp_name, content, comments=None, has_pdf=False, has_api_data=
     source_para.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
 
     # Try to add MP's portrait
-    mp_id = get_mp_id(mp_name)
-    if mp_id:
-        portrait = get_mp_portrait(mp_id)
+    if context is None:
+        mp_id = get_mp_id(mp_name)
+        context = MPContext(mp_id, mp_name) if mp_id else None
+    if context is not None and context.mp_id:
+        portrait = get_mp_portrait(context.mp_id, context=context)
         if portrait:
             doc.add_picture(portrait, width=Inches(2))
             doc.add_paragraph()
@@ -1635,7 +1389,8 @@ def main():
 
         # Get MP ID and API data
         mp_id = get_mp_id(mp_name)
-        verified_positions = get_verified_positions(mp_id) if mp_id else None
+        mp_context = MPContext(mp_id, mp_name) if mp_id else None
+        verified_positions = get_verified_positions(mp_id, context=mp_context) if mp_id else None
 
         # Generate biography with verified positions
         biography = generate_biography(mp_name, input_content, examples, verified_positions)
@@ -1661,7 +1416,8 @@ def main():
                                 has_pdf=has_pdf,
                                 has_api_data=has_api_data,
                                 has_wiki_data=has_wiki_data,
-                                wiki_url=wiki_url)
+                                wiki_url=wiki_url,
+                                context=mp_context)
         print(f"Biography saved to {saved_path}")
 
     except Exception as e:
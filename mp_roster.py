@@ -0,0 +1,251 @@
+"""
+Local mirror of all current House of Commons members.
+
+The roster is bulk-synced from the Members API search endpoint, saved to
+cache/commons_roster.json and refreshed periodically on a background thread,
+so MP name lookups resolve in memory and keep working when the Members API
+is slow or down.
+"""
+import json
+import os
+import threading
+import time
+
+import http_client
+
+CACHE_DIR = 'cache'
+ROSTER_PATH = os.path.join(CACHE_DIR, 'commons_roster.json')
+
+SEARCH_URL = "https://members-api.parliament.uk/api/Members/Search"
+PAGE_SIZE = 20                  # Members API maximum for 'take'
+SYNC_DEADLINE = 60              # seconds for the whole bulk sync
+ROSTER_MAX_AGE = 24 * 60 * 60   # resync once the local copy is a day old
+REFRESH_CHECK_INTERVAL = 60 * 60
+SYNC_RETRY_INTERVAL = 2 * 60    # retry sooner while there is no roster at all
+
+COMMONS_HOUSE_ID = 1
+
+_roster = {'synced_at': 0, 'members': []}
+_loaded = False
+_load_lock = threading.Lock()
+_sync_lock = threading.Lock()
+_refresh_thread = None
+_refresh_thread_lock = threading.Lock()
+
+
+def normalize_name(name):
+    """Normalize names for better matching"""
+    # Remove titles and honorifics
+    name = name.lower().strip()
+
+    # Remove common titles
+    titles = ['sir', 'dame', 'lord', 'baroness', 'rt hon', 'the rt hon', 'dr', 'prof']
+    for title in titles:
+        if name.startswith(title + ' '):
+            name = name[len(title) + 1:]
+
+    # Remove extra whitespace
+    return ' '.join(name.split())
+
+
+def member_to_mp_info(member):
+    """
+    Convert a Members API member record into the app's MP dict.
+
+    Returns None for anyone who is not a Commons MP with a name, id and
+    constituency.
+    """
+    latest_membership = member.get('latestHouseMembership') or {}
+    if latest_membership.get('house') != COMMONS_HOUSE_ID:
+        return None
+
+    mp_info = {
+        'id': member.get('id'),
+        'name': member.get('nameDisplayAs', ''),
+        'party': member.get('latestParty', {}).get('name', '') if member.get('latestParty') else '',
+        'constituency': latest_membership.get('membershipFrom', ''),
+        'house': 'Commons'
+    }
+
+    if mp_info['name'] and mp_info['id'] and mp_info['constituency']:
+        return mp_info
+    return None
+
+
+def _search_params(skip):
+    return {
+        'House': COMMONS_HOUSE_ID,
+        'IsCurrentMember': True,
+        'skip': skip,
+        'take': PAGE_SIZE
+    }
+
+
+def _parse_page(data):
+    members = []
+    for item in data.get('items', []):
+        mp_info = member_to_mp_info(item.get('value', {}))
+        if mp_info:
+            members.append(mp_info)
+    return members
+
+
+def sync_roster():
+    """
+    Download the full list of current Commons members and save it locally.
+
+    The first page gives the total count; the remaining pages are fetched
+    concurrently. The existing roster is kept if the sync comes back
+    incomplete.
+
+    Returns:
+        bool: True if the roster was replaced
+    """
+    global _roster, _loaded
+
+    with _sync_lock:
+        try:
+            print("Syncing Commons roster from Members API...")
+            started = time.monotonic()
+
+            response = http_client.get(SEARCH_URL, params=_search_params(0))
+            if response.status_code != 200:
+                print(f"Roster sync failed: status {response.status_code}")
+                return False
+
+            first_page = response.json()
+            total = first_page.get('totalResults', 0)
+            members = _parse_page(first_page)
+
+            calls = {
+                skip: (SEARCH_URL, {'params': _search_params(skip)})
+                for skip in range(PAGE_SIZE, total, PAGE_SIZE)
+            }
+            responses, missing = http_client.fetch_all(calls, SYNC_DEADLINE)
+
+            for skip in sorted(responses):
+                if responses[skip].status_code == 200:
+                    members.extend(_parse_page(responses[skip].json()))
+                else:
+                    missing.append(skip)
+
+            if missing:
+                print(f"Roster sync incomplete ({len(missing)} pages missing), keeping previous roster")
+                return False
+
+            new_roster = {'synced_at': time.time(), 'members': members}
+
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = ROSTER_PATH + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(new_roster, f)
+            os.replace(tmp_path, ROSTER_PATH)
+
+            _roster = new_roster
+            _loaded = True
+            print(f"Roster synced: {len(members)} MPs in {time.monotonic() - started:.1f}s")
+            return True
+
+        except Exception as e:
+            print(f"Error syncing roster: {str(e)}")
+            return False
+
+
+def _load_from_disk():
+    """Load the saved roster once per process"""
+    global _roster, _loaded
+
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        try:
+            if os.path.exists(ROSTER_PATH):
+                with open(ROSTER_PATH) as f:
+                    _roster = json.load(f)
+                print(f"Loaded roster of {len(_roster['members'])} MPs from disk")
+        except Exception as e:
+            print(f"Error loading roster: {str(e)}")
+        _loaded = True
+
+
+def is_stale():
+    _load_from_disk()
+    return time.time() - _roster['synced_at'] > ROSTER_MAX_AGE
+
+
+def get_members():
+    """Return the current roster (may be empty before the first sync)"""
+    _load_from_disk()
+    return _roster['members']
+
+
+def is_ready():
+    return bool(get_members())
+
+
+def synced_at():
+    """When the current roster was synced (0 before the first sync); changes on every resync"""
+    _load_from_disk()
+    return _roster['synced_at']
+
+
+def _refresh_loop():
+    while True:
+        if is_stale():
+            sync_roster()
+        # Until a first sync succeeds every lookup falls back to the API
+        time.sleep(REFRESH_CHECK_INTERVAL if is_ready() else SYNC_RETRY_INTERVAL)
+
+
+def start_background_refresh():
+    """Start the roster refresh thread once per process (safe to call on every rerun)"""
+    global _refresh_thread
+
+    # Not _sync_lock: sync_roster holds it for a whole sync, and this runs on every rerun
+    if _refresh_thread is not None:
+        return
+    with _refresh_thread_lock:
+        if _refresh_thread is not None:
+            return
+        _refresh_thread = threading.Thread(target=_refresh_loop, name='mp_roster_refresh', daemon=True)
+        _refresh_thread.start()
+
+
+def get_member(mp_id):
+    """Look up a roster entry by member id"""
+    for mp in get_members():
+        if mp['id'] == mp_id:
+            return mp
+    return None
+
+
+def search_roster(query, limit=20):
+    """
+    Find roster entries whose normalised name contains every word of the query.
+
+    Returns:
+        list: MP dicts, exact name matches first
+    """
+    query_norm = normalize_name(query)
+    if not query_norm:
+        return []
+
+    query_words = query_norm.split()
+    exact = []
+    partial = []
+    for mp in get_members():
+        name_norm = normalize_name(mp['name'])
+        if name_norm == query_norm:
+            exact.append(mp)
+        elif all(word in name_norm for word in query_words):
+            partial.append(mp)
+
+    return (exact + partial)[:limit]
+
+
+def find_member(mp_name):
+    """Resolve a name to a single roster entry, or None if nothing matches"""
+    matches = search_roster(mp_name, limit=1)
+    return matches[0] if matches else None
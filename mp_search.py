@@ -0,0 +1,240 @@
+"""
+In-memory search index over the local Commons roster for MP type-ahead.
+
+Names are normalised with normalize_name and every word gets precomputed
+signatures: its prefixes (so "kei sta" finds "Keir Starmer" as you type), a
+phonetic key (so "Llewelyn" and "Lewellyn" or "Chaudhry" and "Chowdhury"
+meet), single-deletion variants (so one or two typos still match) and
+trigrams. Queries are answered entirely in memory, with every candidate
+scored in one pass over those precomputed signatures.
+"""
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+import mp_roster
+from mp_roster import normalize_name
+
+# Per-word scores. PREFIX_MATCH_SCORE matches the old 0.95 "contained in name"
+# score so the auto-select (>= 0.95) and suggestion (>= 0.6) thresholds in
+# validate_mp_name keep their meaning.
+PREFIX_MATCH_SCORE = 0.95
+PHONETIC_MATCH_SCORE = 0.9
+ONE_EDIT_SCORE = 0.88
+TWO_EDIT_SCORE = 0.8
+
+# Names matched only through typo tolerance are offered as suggestions but
+# never auto-selected (validate_mp_name auto-selects at >= 0.95)
+FUZZY_MATCH_CAP = 0.94
+
+# Phonetic and edit matches are too loose on very short words
+MIN_FUZZY_WORD_LENGTH = 4
+
+# Spelling -> sound rewrites applied in order before vowels are dropped.
+# Covers common Welsh (ll, dd, ff), Scottish/Irish (mac/mc, gh) and South
+# Asian (aspirated bh/dh/kh, ow/au, ee/i) spelling variants.
+PHONETIC_RULES = [
+    (r'^mc', 'mac'),
+    (r'^mac', 'mk'),
+    (r'^wr', 'r'),
+    (r'^kn', 'n'),
+    (r'ph', 'f'),
+    (r'ff', 'f'),
+    (r'dd', 'th'),
+    (r'll', 'l'),
+    (r'sch', 's'),
+    (r'sh', 's'),
+    (r'ch', 'k'),
+    (r'ck', 'k'),
+    (r'(?<=[bdgjkpt])h', ''),
+    (r'gh', 'g'),
+    (r'th', 't'),
+    (r'c(?=[eiy])', 's'),
+    (r'c', 'k'),
+    (r'q', 'k'),
+    (r'x', 'ks'),
+    (r'z', 's'),
+    (r'v', 'f'),
+]
+
+
+def trigrams(word):
+    """Character trigrams of a word, padded so the start and end of the word count"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a, b):
+    """Dice coefficient of two trigram sets"""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def phonetic_key(word):
+    """
+    Rough phonetic key for a name word.
+
+    Keeps the first letter, rewrites spelling variants to a common form, drops
+    later vowels and h/w/y, and collapses repeated letters.
+    """
+    word = unicodedata.normalize('NFKD', word)
+    word = ''.join(c for c in word if c.isalpha()).lower()
+    if not word:
+        return ''
+
+    for pattern, replacement in PHONETIC_RULES:
+        word = re.sub(pattern, replacement, word)
+
+    first, rest = word[0], word[1:]
+    rest = re.sub(r'[aeiouhwy]', '', rest)
+    key = first + rest
+    return re.sub(r'(.)\1+', r'\1', key)
+
+
+def deletions(word):
+    """The word itself plus every single-character deletion of it"""
+    variants = {word}
+    for i in range(len(word)):
+        variants.add(word[:i] + word[i + 1:])
+    return variants
+
+
+class WordSignature:
+    """Everything the matcher needs about one word, computed once"""
+
+    __slots__ = ('word', 'phonetic', 'deletions', 'trigrams')
+
+    def __init__(self, word):
+        self.word = word
+        self.phonetic = phonetic_key(word)
+        self.deletions = deletions(word)
+        self.trigrams = trigrams(word)
+
+    def score(self, other):
+        """Similarity of this (query) word to another (name) word, 0..1"""
+        if self.word == other.word:
+            return 1.0
+        if other.word.startswith(self.word):
+            return PREFIX_MATCH_SCORE
+
+        best = dice(self.trigrams, other.trigrams)
+        if min(len(self.word), len(other.word)) >= MIN_FUZZY_WORD_LENGTH:
+            if self.phonetic == other.phonetic:
+                best = max(best, PHONETIC_MATCH_SCORE)
+            if self.word in other.deletions or other.word in self.deletions:
+                best = max(best, ONE_EDIT_SCORE)
+            elif self.deletions & other.deletions:
+                best = max(best, TWO_EDIT_SCORE)
+        return best
+
+
+class MPSearchIndex:
+    """Prefix, phonetic, deletion and trigram index over a list of MP dicts"""
+
+    def __init__(self, members):
+        self.members = list(members)
+        self.names = [normalize_name(mp['name']) for mp in self.members]
+        self.signatures = [[WordSignature(word) for word in name.split()] for name in self.names]
+
+        self.prefixes = defaultdict(set)           # word prefix -> member indexes
+        self.phonetic_postings = defaultdict(set)  # phonetic key -> member indexes
+        self.deletion_postings = defaultdict(set)  # deletion variant -> member indexes
+        self.trigram_postings = defaultdict(set)   # trigram -> member indexes
+
+        for i, signatures in enumerate(self.signatures):
+            for sig in signatures:
+                for end in range(1, len(sig.word) + 1):
+                    self.prefixes[sig.word[:end]].add(i)
+                self.phonetic_postings[sig.phonetic].add(i)
+                for variant in sig.deletions:
+                    self.deletion_postings[variant].add(i)
+                for gram in sig.trigrams:
+                    self.trigram_postings[gram].add(i)
+
+    def _candidates(self, query_signatures):
+        """Members sharing any prefix, phonetic key, deletion variant or trigram with the query"""
+        candidates = set()
+        for sig in query_signatures:
+            candidates.update(self.prefixes.get(sig.word, ()))
+            candidates.update(self.phonetic_postings.get(sig.phonetic, ()))
+            for variant in sig.deletions:
+                candidates.update(self.deletion_postings.get(variant, ()))
+            for gram in sig.trigrams:
+                candidates.update(self.trigram_postings.get(gram, ()))
+        return candidates
+
+    def score_all(self, query):
+        """
+        Score every candidate member against the query in a single pass.
+
+        A name's score is the average, over query words, of the best match
+        among the name's words. An exact normalised name match scores 1.0,
+        all-prefix matches 0.95, and anything needing typo tolerance at most
+        FUZZY_MATCH_CAP.
+
+        Returns:
+            dict: member index -> score
+        """
+        query_norm = normalize_name(query)
+        if not query_norm:
+            return {}
+
+        query_signatures = [WordSignature(word) for word in query_norm.split()]
+        scores = {}
+        for i in self._candidates(query_signatures):
+            if self.names[i] == query_norm:
+                scores[i] = 1.0
+                continue
+            name_signatures = self.signatures[i]
+            total = 0.0
+            cap = PREFIX_MATCH_SCORE
+            for sig in query_signatures:
+                best = max(sig.score(other) for other in name_signatures)
+                if best < PREFIX_MATCH_SCORE:
+                    cap = FUZZY_MATCH_CAP
+                total += best
+            scores[i] = min(total / len(query_signatures), cap)
+        return scores
+
+    def search(self, query, limit=10):
+        """
+        Rank members against a query.
+
+        Returns:
+            list: (mp dict, score) tuples, best first, with scores in 0..1
+        """
+        scores = self.score_all(query)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.names[item[0]]))
+        return [(self.members[i], score) for i, score in ranked[:limit]]
+
+
+def rank(query, members, limit=40):
+    """Rank an arbitrary list of MP dicts (e.g. API search results) against a query"""
+    return MPSearchIndex(members).search(query, limit)
+
+
+_index = None
+_index_members = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return an index over the current roster, rebuilding it when the roster changes"""
+    global _index, _index_members
+
+    members = mp_roster.get_members()
+    if _index is not None and _index_members is members:
+        return _index
+
+    with _index_lock:
+        if _index is None or _index_members is not members:
+            _index = MPSearchIndex(members)
+            _index_members = members
+        return _index
+
+
+def search(query, limit=10):
+    """Ranked (mp, score) suggestions for a query from the local roster"""
+    return get_index().search(query, limit)
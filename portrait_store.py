@@ -0,0 +1,147 @@
+"""
+On-disk store of MP portraits keyed by member id.
+
+The Members API thumbnail is downloaded once and kept as-is, alongside a
+variant resized and recompressed for the 2-inch slot in the generated DOCX.
+Re-renders and batch exports read from disk instead of the network, and each
+document embeds a smaller image.
+"""
+import io
+import os
+import threading
+import time
+
+from PIL import Image
+
+import http_client
+
+PORTRAIT_DIR = os.path.join('cache', 'portraits')
+
+THUMBNAIL_URL = "https://members-api.parliament.uk/api/Members/{mp_id}/Thumbnail"
+
+# Portraits change rarely; re-download after a month
+PORTRAIT_MAX_AGE = 30 * 24 * 60 * 60
+
+# The DOCX slot is 2 inches wide; 300 DPI keeps it sharp in print
+DOCX_WIDTH_INCHES = 2
+DOCX_DPI = 300
+DOCX_JPEG_QUALITY = 85
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(mp_id):
+    """One lock per member so concurrent renders download a portrait once"""
+    with _locks_guard:
+        return _locks.setdefault(mp_id, threading.Lock())
+
+
+def _original_path(mp_id):
+    return os.path.join(PORTRAIT_DIR, f"{mp_id}.img")
+
+
+def _docx_path(mp_id):
+    return os.path.join(PORTRAIT_DIR, f"{mp_id}_docx.jpg")
+
+
+def _is_fresh(path):
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < PORTRAIT_MAX_AGE
+
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def make_docx_variant(image_bytes):
+    """
+    Downscale and recompress a portrait for the DOCX slot.
+
+    Images already smaller than the target are recompressed but not enlarged.
+    """
+    target_width = DOCX_WIDTH_INCHES * DOCX_DPI
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = image.convert('RGB')
+        if image.width > target_width:
+            target_height = round(image.height * target_width / image.width)
+            image = image.resize((target_width, target_height), Image.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=DOCX_JPEG_QUALITY, optimize=True, progressive=True)
+        return output.getvalue()
+
+
+def get_original(mp_id, fetch=None):
+    """
+    Return the original thumbnail bytes for an MP, downloading if needed.
+
+    Args:
+        mp_id: Member id
+        fetch (callable): Optional function returning the thumbnail bytes (or
+            None); used so an MPContext can supply its own memoised download
+
+    Returns:
+        bytes or None
+    """
+    if not mp_id:
+        return None
+
+    path = _original_path(mp_id)
+    if _is_fresh(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    with _lock_for(mp_id):
+        if _is_fresh(path):
+            with open(path, 'rb') as f:
+                return f.read()
+
+        if fetch is not None:
+            image_bytes = fetch()
+        else:
+            response = http_client.get(THUMBNAIL_URL.format(mp_id=mp_id))
+            image_bytes = response.content if response.status_code == 200 else None
+
+        if not image_bytes:
+            # Fall back to an expired copy rather than no portrait at all
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return f.read()
+            return None
+
+        os.makedirs(PORTRAIT_DIR, exist_ok=True)
+        _write_atomic(path, image_bytes)
+
+        # The DOCX variant is derived from the original, so rebuild it too
+        if os.path.exists(_docx_path(mp_id)):
+            os.remove(_docx_path(mp_id))
+        return image_bytes
+
+
+def get_docx_portrait(mp_id, fetch=None):
+    """
+    Return the DOCX-sized portrait as a BytesIO, or None if unavailable.
+
+    Falls back to the original image if it can't be resized.
+    """
+    original = get_original(mp_id, fetch)
+    if original is None:
+        return None
+
+    path = _docx_path(mp_id)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return io.BytesIO(f.read())
+
+    try:
+        variant = make_docx_variant(original)
+        _write_atomic(path, variant)
+        print(f"Cached DOCX portrait for {mp_id}: {len(original)} -> {len(variant)} bytes")
+        return io.BytesIO(variant)
+    except Exception as e:
+        print(f"Error resizing portrait for {mp_id}: {str(e)}")
+        return io.BytesIO(original)
@@ -0,0 +1,91 @@
+"""
+Background prefetch of everything a biography generation needs for an MP.
+
+As soon as an MP is selected in step 1, verified positions (Synopsis,
+ContributionSummary and Biography), the verified Wikipedia page and the
+portrait start loading on a small worker pool. The user then spends
+steps 2-3 configuring and adding information, and by step 4
+generate_biography_flow finds the data already warm.
+
+Prefetches are kept in a process-wide registry keyed by member id, so reruns
+and other sessions selecting the same MP share one set of requests.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import wiki_resolver
+from mp_context import MPContext
+from mp_functions import get_cached_verified_positions
+
+# Re-fetch once a prefetch is this old (seconds)
+PREFETCH_TTL = 10 * 60
+
+# Upper bound on how long generation waits for a prefetch job
+RESULT_TIMEOUT = 60
+
+# Separate from http_client's pool: these jobs block while their own
+# requests run on that pool
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='prefetch')
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Prefetch:
+    """In-flight background loads for one MP, sharing one MPContext"""
+
+    def __init__(self, selected_mp):
+        self.context = MPContext.from_selected_mp(selected_mp)
+        self.started_at = time.monotonic()
+        mp_id = self.context.mp_id
+        self.futures = {
+            'positions': _executor.submit(get_cached_verified_positions, mp_id, context=self.context),
+            'wiki': _executor.submit(wiki_resolver.resolve, selected_mp['name'], selected_mp['constituency']),
+            'portrait': _executor.submit(self.context.portrait),
+        }
+        print(f"Prefetching data for {selected_mp['name']} ({mp_id})")
+
+    def is_expired(self):
+        return time.monotonic() - self.started_at > PREFETCH_TTL
+
+    def is_ready(self, name):
+        return self.futures[name].done()
+
+    def result(self, name, timeout=RESULT_TIMEOUT):
+        """
+        Wait for a prefetched value.
+
+        Raises whatever the job raised, or TimeoutError if it is still
+        running after `timeout` seconds.
+        """
+        return self.futures[name].result(timeout=timeout)
+
+
+def start(selected_mp):
+    """
+    Start (or reuse) the prefetch for an MP; safe to call on every rerun.
+
+    Returns:
+        Prefetch
+    """
+    mp_id = selected_mp['id']
+    with _registry_lock:
+        prefetch = _registry.get(mp_id)
+        if prefetch is None or prefetch.is_expired():
+            prefetch = Prefetch(selected_mp)
+            _registry[mp_id] = prefetch
+
+        # Drop other expired entries so the registry doesn't grow forever
+        for other_id in [i for i, p in _registry.items() if p.is_expired()]:
+            del _registry[other_id]
+        return prefetch
+
+
+def get(mp_id):
+    """The live prefetch for an MP, or None"""
+    with _registry_lock:
+        prefetch = _registry.get(mp_id)
+        if prefetch is None or prefetch.is_expired():
+            return None
+        return prefetch
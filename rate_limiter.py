@@ -0,0 +1,96 @@
+"""
+Adaptive per-host token bucket used by http_client and async_client.
+
+Each upstream host gets one bucket shared by every fetcher in the process.
+The refill rate adapts AIMD-style: it creeps up on every successful response
+and is halved on 429/503 or a timeout, and a Retry-After header pauses the
+host entirely until it has passed. Batch runs settle at the highest rate the
+upstream sustains instead of bursting into throttling and timeouts.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+THROTTLE_STATUSES = (429, 503)
+
+# Never honour a Retry-After longer than this; the request would outlive any deadline
+MAX_RETRY_AFTER = 60
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """
+    Token bucket whose rate adapts to upstream throttling.
+
+    Args:
+        rate (float): Starting requests per second
+        burst (int): Bucket size, i.e. requests allowed back to back
+        min_rate (float): Floor the rate never drops below
+        max_rate (float): Ceiling the rate never grows past
+        increase (float): Requests per second added after each success
+    """
+
+    def __init__(self, rate, burst, min_rate, max_rate, increase):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """
+        Take a token and return how long the caller must wait before sending.
+
+        Tokens may go negative: each caller reserves the next free slot, so
+        concurrent callers are spaced out rather than all waking at once.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self._paused_until - now)
+
+    def acquire(self):
+        """Block until the caller may send one request"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self):
+        """Additive increase after a response that wasn't throttled"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        """Halve the rate, drop any saved-up burst and honour Retry-After"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
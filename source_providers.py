@@ -0,0 +1,207 @@
+"""
+Source providers feeding generate_biography.
+
+Each provider wraps one source of biography material (Wikipedia, Parliament
+positions, an uploaded PDF, Hansard comments, manual notes) and declares its
+cost and deadline. run_providers() runs them concurrently and hands back a
+SourceResults; a provider that fails or misses its deadline is left out, so
+the prompt is built from whatever arrived instead of blocking the whole run.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import wiki_resolver
+from mp_functions import get_cached_verified_positions, read_pdf
+
+# Relative cost of a provider; run_providers(max_cost=...) skips dearer ones
+COST_MEMORY = 0     # already in memory, run inline
+COST_DISK = 1       # local file parsing
+COST_NETWORK = 2    # one or more upstream API calls
+
+# Separate from http_client's pool: providers block while their own requests
+# run on that pool
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='source_provider')
+
+
+class SourceProvider:
+    """
+    Base class for a biography source.
+
+    Subclasses set name, cost and deadline (seconds) and implement fetch(),
+    returning the source's value or None if it has nothing.
+    """
+
+    name = None
+    cost = COST_MEMORY
+    deadline = 5
+
+    def fetch(self):
+        raise NotImplementedError
+
+
+class WikipediaProvider(SourceProvider):
+    """The MP's resolved Wikipedia article (a WikiResult)"""
+
+    name = 'wikipedia'
+    cost = COST_NETWORK
+    deadline = 30
+
+    def __init__(self, mp_name, constituency=None, prefetch=None):
+        self.mp_name = mp_name
+        self.constituency = constituency
+        self.prefetch = prefetch
+
+    def fetch(self):
+        if self.prefetch is not None:
+            return self.prefetch.result('wiki', timeout=self.deadline)
+        return wiki_resolver.resolve(self.mp_name, self.constituency)
+
+
+class PositionsProvider(SourceProvider):
+    """Verified positions from the Members API (see get_verified_positions)"""
+
+    name = 'verified_positions'
+    cost = COST_NETWORK
+    deadline = 20
+
+    def __init__(self, mp_id, context=None, prefetch=None):
+        self.mp_id = mp_id
+        self.context = context
+        self.prefetch = prefetch
+
+    def fetch(self):
+        if not self.mp_id:
+            return None
+        if self.prefetch is not None:
+            return self.prefetch.result('positions', timeout=self.deadline)
+        return get_cached_verified_positions(self.mp_id, context=self.context)
+
+
+class PdfProvider(SourceProvider):
+    """Structured text extracted from a user-supplied PDF"""
+
+    name = 'pdf'
+    cost = COST_DISK
+    deadline = 30
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def fetch(self):
+        if not self.file_path:
+            return None
+        return read_pdf(self.file_path)
+
+
+class HansardCommentsProvider(SourceProvider):
+    """Hansard contributions the user selected"""
+
+    name = 'hansard_comments'
+
+    def __init__(self, comments):
+        self.comments = comments
+
+    def fetch(self):
+        return list(self.comments or []) or None
+
+
+class ManualNotesProvider(SourceProvider):
+    """Free-text information and manual comments entered by the user"""
+
+    name = 'manual_notes'
+
+    def __init__(self, text=None, comments=None):
+        self.text = text
+        self.comments = comments
+
+    def fetch(self):
+        text = (self.text or '').strip()
+        comments = list(self.comments or [])
+        if not text and not comments:
+            return None
+        return {'text': text, 'comments': comments}
+
+
+class SourceResults:
+    """What run_providers gathered: values by provider name plus what's missing"""
+
+    def __init__(self):
+        self.values = {}
+        self.missing = []       # providers that failed or missed their deadline
+        self.skipped = []       # providers over the cost limit
+        self.timings = {}
+
+    def __repr__(self):
+        return f"SourceResults(have={sorted(self.values)}, missing={self.missing})"
+
+    def get(self, name, default=None):
+        return self.values.get(name, default)
+
+    def has(self, name):
+        return self.values.get(name) is not None
+
+    def comments(self):
+        """Hansard comments followed by manual comments"""
+        comments = list(self.get('hansard_comments') or [])
+        comments.extend((self.get('manual_notes') or {}).get('comments', []))
+        return comments
+
+    def notes_text(self):
+        return (self.get('manual_notes') or {}).get('text', '')
+
+
+def _timed_fetch(provider):
+    started = time.monotonic()
+    value = provider.fetch()
+    return value, time.monotonic() - started
+
+
+def run_providers(providers, max_cost=None):
+    """
+    Run providers concurrently, each bounded by its own deadline.
+
+    In-memory providers run inline; everything else goes to a worker pool.
+    Deadlines are measured from the start of the run.
+
+    Args:
+        providers (list): SourceProvider instances
+        max_cost (int): Skip providers costlier than this (e.g. COST_MEMORY
+            for an offline run)
+
+    Returns:
+        SourceResults
+    """
+    results = SourceResults()
+    started = time.monotonic()
+    futures = {}
+
+    # Submit the slow ones first so they overlap with the inline ones
+    for provider in sorted(providers, key=lambda p: -p.cost):
+        if max_cost is not None and provider.cost > max_cost:
+            results.skipped.append(provider.name)
+        elif provider.cost > COST_MEMORY:
+            futures[provider] = _executor.submit(_timed_fetch, provider)
+
+    for provider in providers:
+        if provider.cost != COST_MEMORY or provider.name in results.skipped:
+            continue
+        try:
+            results.values[provider.name], results.timings[provider.name] = _timed_fetch(provider)
+        except Exception as e:
+            print(f"Source '{provider.name}' failed: {str(e)}")
+            results.missing.append(provider.name)
+
+    for provider, future in futures.items():
+        remaining = max(0, provider.deadline - (time.monotonic() - started))
+        try:
+            results.values[provider.name], results.timings[provider.name] = future.result(timeout=remaining)
+        except Exception as e:
+            if not future.done():
+                future.cancel()
+                print(f"Source '{provider.name}' missed its {provider.deadline}s deadline, continuing without it")
+            else:
+                print(f"Source '{provider.name}' failed: {str(e)}")
+            results.missing.append(provider.name)
+
+    print(f"Sources gathered in {time.monotonic() - started:.1f}s: {results}")
+    return results
@@ -4,11 +4,9 @@ from docx import Document
 import io
 import asyncio
 import json
-import time
 from datetime import datetime, timedelta
 import bcrypt
-import requests
-from difflib import SequenceMatcher
+import http_client
 from functools import lru_cache
 import anthropic
 import base64
@@ -17,13 +15,22 @@ from mp_functions import (
     read_example_bios,
     get_mp_id,
     get_mp_data,
-    get_wiki_data_verified,    # ← Changed
-    get_wiki_url_verified,
     generate_biography,
     save_biography,
-    get_verified_positions,
-    search_perplexity
+    get_cached_verified_positions,
+    clear_verified_positions_cache,
+    search_perplexity,
+    ANTHROPIC_HOST
 )
+import hansard
+import hansard_index
+import hansard_links
+import health_monitor
+import mp_roster
+import mp_search
+import prefetch
+import source_providers
+import wiki_index
 
 favicon = Image.open("favicon2.png")
 
@@ -35,6 +42,20 @@ os.makedirs('uploads', exist_ok=True)
 os.makedirs('new_bios', exist_ok=True)
 os.makedirs('example_bios', exist_ok=True)
 
+# Keep the local Commons roster and Wikipedia MP index fresh in the background (once per process)
+mp_roster.start_background_refresh()
+wiki_index.start_background_refresh()
+
+# Probe upstream APIs in the background; the sidebar reads the cached status
+health_monitor.start_background_monitor()
+
+HEALTH_ICONS = {
+    health_monitor.UP: ("✅", "Available"),
+    health_monitor.DEGRADED: ("⚠️", "Limited"),
+    health_monitor.DOWN: ("❌", "Unavailable"),
+    health_monitor.UNKNOWN: ("○", "Checking..."),
+}
+
 
 def get_logo_base64(image_path):
     """Convert logo image to base64 string"""
@@ -454,7 +475,7 @@ def styled_login_page():
                     st.error("Invalid username or password")
 
 
-def generate_biography_flow(selected_mp, user_input, comments):
+def generate_biography_flow(selected_mp, user_input, hansard_comments, manual_comments):
     """Handle the complete biography generation flow with progress - FIXED KEYS"""
 
     # Reset generation flag with different name
@@ -481,6 +502,11 @@ def generate_biography_flow(selected_mp, user_input, comments):
             mp_name = selected_mp['name']
             mp_id = selected_mp['id']
 
+            # Usually already warm: the prefetch started when the MP was selected.
+            # Its context is shared so each Members API endpoint is fetched once.
+            warm = prefetch.start(selected_mp)
+            mp_context = warm.context
+
             # Step 1: Read example biographies (10%)
             status_text.text('📚 Reading example biographies...')
             progress_bar.progress(10)
@@ -493,50 +519,49 @@ def generate_biography_flow(selected_mp, user_input, comments):
 
             examples = read_example_bios()
 
-            # Step 2: Get verified parliamentary positions (25%)
-            status_text.text('🏛️ Fetching verified parliamentary positions...')
+            # Steps 2-3: Gather sources concurrently, each under its own deadline (25-45%)
+            status_text.text('🏛️ Gathering parliamentary positions and Wikipedia information...')
             progress_bar.progress(25)
 
             if st.session_state.generation_cancelled:
                 return
 
-            verified_positions = None
-            try:
-                verified_positions = get_verified_positions(mp_id)
-                with details_expander:
-                    if verified_positions:
-                        st.write("✅ Retrieved parliamentary API data")
-                        if verified_positions.get('current_committees'):
-                            st.write(f"  - Found {len(verified_positions['current_committees'])} current committee memberships")
-                        if verified_positions.get('current_roles'):
-                            st.write(f"  - Found {len(verified_positions['current_roles'])} current government/opposition roles")
-                    else:
-                        st.write("⚠️ No parliamentary API data available")
-            except Exception as e:
-                with details_expander:
-                    st.write(f"⚠️ Parliament API error: {str(e)}")
-
-            # Step 3: Get Wikipedia data (45%)
-            status_text.text('📖 Fetching Wikipedia information...')
+            sources = source_providers.run_providers([
+                source_providers.PositionsProvider(mp_id, context=mp_context, prefetch=warm),
+                source_providers.WikipediaProvider(mp_name, selected_mp['constituency'], prefetch=warm),
+                source_providers.HansardCommentsProvider(hansard_comments),
+                source_providers.ManualNotesProvider(user_input, manual_comments),
+            ])
+            comments = sources.comments()
             progress_bar.progress(45)
 
-            if st.session_state.generation_cancelled:
-                return
+            verified_positions = sources.get('verified_positions')
+            with details_expander:
+                if verified_positions:
+                    st.write("✅ Retrieved parliamentary API data")
+                    if verified_positions.get('current_committees'):
+                        st.write(f"  - Found {len(verified_positions['current_committees'])} current committee memberships")
+                    if verified_positions.get('current_roles'):
+                        st.write(f"  - Found {len(verified_positions['current_roles'])} current government/opposition roles")
+                    if verified_positions.get('partial'):
+                        st.write(f"  - ⚠️ Partial data, missing: {', '.join(verified_positions.get('missing_sections', []))}")
+                elif 'verified_positions' in sources.missing:
+                    st.write("⚠️ Parliament API data not available in time, continuing without it")
+                else:
+                    st.write("⚠️ No parliamentary API data available")
 
+            wiki = sources.get('wikipedia')
             wiki_data = None
             wiki_url = None
-            try:
-                wiki_data = get_wiki_data_verified(selected_mp['name'], selected_mp['constituency'])
-                if wiki_data:
-                    wiki_url = get_wiki_url_verified(selected_mp['name'], selected_mp['constituency'])
-                    with details_expander:
-                        st.write(f"✅ Wikipedia data retrieved ({len(wiki_data)} characters)")
+            with details_expander:
+                if wiki:
+                    wiki_data = wiki.content
+                    wiki_url = wiki.url
+                    st.write(f"✅ Wikipedia data retrieved ({len(wiki_data)} characters, confidence {wiki.confidence:.0%})")
+                elif 'wikipedia' in sources.missing:
+                    st.write("⚠️ Wikipedia not available in time, continuing without it")
                 else:
-                    with details_expander:
-                        st.write("⚠️ No verified Wikipedia page found")
-            except Exception as e:
-                with details_expander:
-                    st.write(f"⚠️ Wikipedia error: {str(e)}")
+                    st.write("⚠️ No verified Wikipedia page found")
 
             # Step 4: Prepare input content (60%)
             status_text.text('📝 Preparing biography content...')
@@ -579,7 +604,10 @@ def generate_biography_flow(selected_mp, user_input, comments):
                 examples,
                 verified_positions,
                 comments,
-                length_setting
+                length_setting,
+                context=mp_context,
+                wiki=wiki,
+                sources=sources
             )
 
             # Step 6: Save biography (95%)
@@ -596,7 +624,9 @@ def generate_biography_flow(selected_mp, user_input, comments):
                 has_pdf=False,
                 has_api_data=bool(verified_positions),
                 has_wiki_data=bool(wiki_data),
-                wiki_url=wiki_url
+                wiki_url=wiki_url,
+                context=mp_context,
+                wiki=wiki
             )
 
             # Step 7: Complete (100%)
@@ -667,7 +697,7 @@ def create_enhanced_sidebar():
             # Get and display verified positions
             with st.spinner("Loading parliamentary data..."):
                 try:
-                    verified_positions = get_verified_positions(selected_mp['id'])
+                    verified_positions = get_cached_verified_positions(selected_mp['id'])
                     if verified_positions:
                         st.subheader("Current Positions")
 
@@ -739,24 +769,13 @@ def create_enhanced_sidebar():
         # API Status
         st.header("🔗 API Status")
 
-        # Anthropic
-        st.write("✅ **Claude AI:** Ready")
-
-        # Hansard API
-        try:
-            hansard_test = requests.get("https://hansard-api.parliament.uk/overview/firstyear.json", timeout=2)
-            if hansard_test.status_code == 200:
-                st.write("✅ **Hansard API:** Available")
-            else:
-                st.write("⚠️ **Hansard API:** Limited")
-        except:
-            st.write("❌ **Hansard API:** Unavailable")
-
-        # Parliament API
-        if selected_mp:
-            st.write("✅ **Parliament API:** Connected")
-        else:
-            st.write("○ **Parliament API:** Waiting for MP")
+        # Cached results from the background health monitor - no network I/O here
+        for upstream in health_monitor.get_status().values():
+            icon, text = HEALTH_ICONS[upstream['state']]
+            line = f"{icon} **{upstream['label']}:** {text}"
+            if upstream['state'] in (health_monitor.DEGRADED, health_monitor.DOWN):
+                line += f" ({upstream['detail'][:60]})"
+            st.write(line)
 
         st.divider()
 
@@ -776,11 +795,13 @@ def create_enhanced_sidebar():
 
             # Clear cache
             cached_search_mps.cache_clear()
+            clear_verified_positions_cache()
             st.success("All data cleared!")
             st.rerun()
 
         if st.button("🔄 Clear Cache", key="clear_cache_enhanced"):
             cached_search_mps.cache_clear()
+            clear_verified_positions_cache()
             st.success("Cache cleared!")
 
 def create_manual_comments_section():
@@ -893,7 +914,7 @@ def test_hansard_api_simple():
     if st.button("Test Basic API", key="test_basic"):
         try:
             test_url = "https://hansard-api.parliament.uk/overview/firstyear.json"
-            response = requests.get(test_url, timeout=5)
+            response = http_client.get(test_url, timeout=5)
             st.write(f"Status: {response.status_code}")
             st.write(f"Response: {response.text}")
             if response.status_code == 200:
@@ -917,7 +938,7 @@ def test_hansard_api_simple():
                 'queryParameters.orderBy': 'SittingDateDesc'
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = http_client.get(url, params=params, timeout=10)
             st.write(f"Status: {response.status_code}")
 
             if response.status_code == 200:
@@ -959,7 +980,7 @@ def test_hansard_api_simple():
             url = "https://hansard-api.parliament.uk/search/parlisearchredirect.json"
             params = {'externalId': test_ext_id}
 
-            response = requests.get(url, params=params, timeout=5)
+            response = http_client.get(url, params=params, timeout=5)
             st.write(f"Status: {response.status_code}")
             st.write(f"Response: {response.text}")
 
@@ -999,41 +1020,6 @@ def test_hansard_api_simple():
             st.warning("Please enter a contribution ID first")
 
 
-def get_hansard_url(contribution_ext_id):
-    """Get the web URL for a Hansard contribution using the redirect endpoint"""
-    try:
-        if not contribution_ext_id:
-            return None
-
-        url = "https://hansard-api.parliament.uk/search/parlisearchredirect.json"
-        params = {'externalId': contribution_ext_id}
-
-        response = requests.get(url, params=params, timeout=5)
-
-        if response.status_code == 200:
-            # The API returns the URL path as a string
-            hansard_path = response.text.strip().strip('"')
-
-            # Check if it's a relative URL (starts with /)
-            if hansard_path and hansard_path.startswith('/'):
-                # Convert relative URL to absolute URL
-                hansard_url = f"https://hansard.parliament.uk{hansard_path}"
-                return hansard_url
-
-            # Check if it's already an absolute URL
-            elif hansard_path and hansard_path.startswith('http'):
-                return hansard_path
-
-            # If we get something else, try to construct it
-            elif hansard_path:
-                # Some responses might not have the leading slash
-                hansard_url = f"https://hansard.parliament.uk/{hansard_path.lstrip('/')}"
-                return hansard_url
-
-    except Exception as e:
-        print(f"Error getting Hansard URL for {contribution_ext_id}: {str(e)}")
-
-    return None
 # NEW FUNCTIONS FOR HANSARD SEARCH
 #
 #
@@ -1141,6 +1127,10 @@ def create_hansard_search_inline():
     if st.session_state.hansard_results:
         st.write(f"**📋 Found {len(st.session_state.hansard_results)} Parliamentary Records:**")
 
+        # Stored links show now; missing ones are requested in the background
+        # and show on the next rerun (or are waited for when added)
+        hansard_links.fill(st.session_state.hansard_results, timeout=0)
+
         # Show results with contribution type badges
         for i, result in enumerate(st.session_state.hansard_results):
             # Checkbox for selection
@@ -1168,8 +1158,8 @@ def create_hansard_search_inline():
             st.markdown(f"**{format_hansard_date(result['date'])}** {type_badge} {result['contribution_type']} - {result['debate_title']}")
             st.caption(f"Found by search term: '{result['search_term']}'")
 
-            # Show content excerpt
-            text_to_show = result['full_text'] if result['full_text'] else result['text']
+            # Show content excerpt (the matching snippet for local index results)
+            text_to_show = result.get('snippet') or result['full_text'] or result['text']
             if len(text_to_show) > 600:
                 text_to_show = text_to_show[:600] + "..."
 
@@ -1187,7 +1177,8 @@ def create_hansard_search_inline():
             st.info(f"📌 {selected_count} records selected")
 
             if st.button(f"➕ Add {selected_count} Selected Records", type="primary", use_container_width=True):
-                # Add selected items to comments
+                # Add selected items to comments, resolving their Hansard links in one batch
+                hansard_links.fill([r for r in st.session_state.hansard_results if r['id'] in st.session_state.selected_hansard_items])
                 new_comments = []
                 for result in st.session_state.hansard_results:
                     if result['id'] in st.session_state.selected_hansard_items:
@@ -1318,12 +1309,13 @@ def create_actions_section():
 
     # Generation button
     if st.button("🚀 Generate Biography", type="primary", key="generate_biography_main", use_container_width=True):
-        # Collect all comments
-        all_comments = st.session_state.get('hansard_comments_added', []).copy()
-        all_comments.extend(st.session_state.get('manual_comments_added', []))
-
         # Start generation flow
-        generate_biography_flow(selected_mp, user_input, all_comments)
+        generate_biography_flow(
+            selected_mp,
+            user_input,
+            st.session_state.get('hansard_comments_added', []),
+            st.session_state.get('manual_comments_added', [])
+        )
 
 
 def generate_search_terms(issue_description, mp_name):
@@ -1350,7 +1342,9 @@ renewable energy
 
 Now generate search terms for: {issue_description}"""
 
-        response = client.messages.create(
+        response = http_client.call(
+            ANTHROPIC_HOST,
+            client.messages.create,
             model="claude-3-5-haiku-20241022",
             max_tokens=200,
             temperature=0.7,
@@ -1651,6 +1645,10 @@ def create_hansard_search_section_wizard():
     if st.session_state.hansard_search_performed and st.session_state.hansard_results:
         st.subheader(f"📋 Search Results ({len(st.session_state.hansard_results)} found)")
 
+        # Stored links show now; missing ones are requested in the background
+        # and show on the next rerun (or are waited for when added)
+        hansard_links.fill(st.session_state.hansard_results, timeout=0)
+
         # Selection controls
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -1685,7 +1683,8 @@ def create_hansard_search_section_wizard():
                 st.markdown(f"**{result_date}** - {result['debate_title']}")
                 st.caption(f"Found by search term: '{result['search_term']}'")
 
-                text_to_show = result['full_text'] if result['full_text'] else result['text']
+                # The matching snippet for local index results
+                text_to_show = result.get('snippet') or result['full_text'] or result['text']
                 if len(text_to_show) > 400:
                     text_to_show = text_to_show[:400] + "..."
                 st.write(text_to_show)
@@ -1699,6 +1698,7 @@ def create_hansard_search_section_wizard():
         if st.session_state.selected_hansard_items:
             if st.button(f"➕ Add {len(st.session_state.selected_hansard_items)} Selected Items",
                         type="primary", key="add_hansard_wizard", use_container_width=True):
+                hansard_links.fill([r for r in st.session_state.hansard_results if r['id'] in st.session_state.selected_hansard_items])
                 new_comments = []
                 for result in st.session_state.hansard_results:
                     if result['id'] in st.session_state.selected_hansard_items:
@@ -2055,10 +2055,12 @@ def wizard_step_4_generate():
         with col2:
             if st.button("🚀 Generate Biography", type="primary", key="final_generate", use_container_width=True):
                 user_input = st.session_state.get('additional_info', '')
-                all_comments = st.session_state.get('hansard_comments_added', []).copy()
-                all_comments.extend(st.session_state.get('manual_comments_added', []))
-
-                generate_biography_flow(selected_mp, user_input, all_comments)
+                generate_biography_flow(
+                    selected_mp,
+                    user_input,
+                    st.session_state.get('hansard_comments_added', []),
+                    st.session_state.get('manual_comments_added', [])
+                )
 
     # Navigation
     st.divider()
@@ -2084,291 +2086,20 @@ def wizard_step_4_generate():
                 st.rerun()
 
 def search_hansard_contributions(mp_id, search_terms, start_date=None, end_date=None, max_results=20):
-    """Search both Hansard API and Questions & Statements API for all types of MP contributions"""
-    all_results = []
-
-    # Set default date range (last 2 years if not specified)
-    if not start_date:
-        start_date = (datetime.now() - timedelta(days=730)).strftime('%Y-%m-%d')
-    if not end_date:
-        end_date = datetime.now().strftime('%Y-%m-%d')
-
-    # PART 1: Search Hansard API for spoken contributions and written answers
-    hansard_base_url = "https://hansard-api.parliament.uk"
-    hansard_endpoints = [
-        {
-            'url': f"{hansard_base_url}/search/contributions/Spoken.json",
-            'type': 'Spoken Contribution'
-        },
-        {
-            'url': f"{hansard_base_url}/search/writtenanswers.json",
-            'type': 'Written Answer'
-        }
-    ]
-
-    # Search Hansard API with better timeout and error handling
-    for search_term in search_terms:
-        for endpoint in hansard_endpoints:
-            try:
-                params = {
-                    'queryParameters.searchTerm': search_term,
-                    'queryParameters.memberId': mp_id,
-                    'queryParameters.startDate': start_date,
-                    'queryParameters.endDate': end_date,
-                    'queryParameters.take': 4,  # API max per type
-                    'queryParameters.orderBy': 'SittingDateDesc'
-                }
-
-                # Increased timeout and better error handling
-                response = requests.get(endpoint['url'], params=params, timeout=20)
-
-                if response.status_code == 200:
-                    data = response.json()
-
-                    if 'Results' in data and data['Results']:
-                        for result in data['Results']:
-                            if endpoint['type'] == 'Spoken Contribution':
-                                contribution_ext_id = result.get('ContributionExtId', '')
-                                hansard_url = get_hansard_url(contribution_ext_id)
-
-                                contribution = {
-                                    'id': contribution_ext_id,
-                                    'date': result.get('SittingDate', ''),
-                                    'debate_title': result.get('DebateSection', 'Parliamentary Debate'),
-                                    'text': result.get('ContributionText', ''),
-                                    'full_text': result.get('ContributionTextFull', ''),
-                                    'member_name': result.get('MemberName', ''),
-                                    'hansard_section': result.get('HansardSection', ''),
-                                    'search_term': search_term,
-                                    'contribution_type': endpoint['type'],
-                                    'house': result.get('House', 'Commons'),
-                                    'url': hansard_url
-                                }
-
-                            elif endpoint['type'] == 'Written Answer':
-                                contribution = {
-                                    'id': result.get('Id', result.get('AnswerId', '')),
-                                    'date': result.get('Date', result.get('AnswerDate', '')),
-                                    'debate_title': f"Written Answer: {(result.get('QuestionText', result.get('Question', 'Parliamentary Question'))[:50])}...",
-                                    'text': result.get('AnswerText', result.get('Answer', '')),
-                                    'full_text': result.get('AnswerText', result.get('Answer', '')),
-                                    'member_name': result.get('MemberName', ''),
-                                    'hansard_section': result.get('Department', result.get('AnsweringDepartment', '')),
-                                    'search_term': search_term,
-                                    'contribution_type': endpoint['type'],
-                                    'house': result.get('House', 'Commons'),
-                                    'url': result.get('Url', '')
-                                }
-
-                            # Only add if we have meaningful content and valid ID
-                            if contribution['text'] and len(contribution['text'].strip()) > 30 and contribution['id']:
-                                all_results.append(contribution)
-
-                elif response.status_code == 404:
-                    continue
-                else:
-                    st.warning(f"Hansard API returned status {response.status_code} for {endpoint['type']}")
-
-            except requests.exceptions.Timeout:
-                st.warning(f"Timeout searching Hansard {endpoint['type']} for '{search_term}' - API is slow, continuing with other searches")
-                continue
-            except Exception as e:
-                st.warning(f"Error searching Hansard {endpoint['type']} for '{search_term}': {str(e)}")
-                continue
-
-    # PART 2: Search Questions & Statements API for written questions and written statements
-    questions_base_url = "https://questions-statements-api.parliament.uk"
-
-    for search_term in search_terms:
-        # Search Written Questions with better filtering
-        try:
-            questions_url = f"{questions_base_url}/api/writtenquestions/questions"
-            params = {
-                'askingMemberId': mp_id,
-                'tabledWhenFrom': start_date,
-                'tabledWhenTo': end_date,
-                'take': 50,  # Get more results to filter client-side
-                'house': 'Commons'
-                # Note: Removing searchTerm from API call and filtering client-side instead
-            }
-
-            response = requests.get(questions_url, params=params, timeout=20)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                if 'results' in data and data['results']:
-                    questions_found = 0
-                    for item in data['results']:
-                        # Stop if we have enough questions for this search term
-                        if questions_found >= 4:
-                            break
-
-                        question = item.get('value', {})
-
-                        question_id = question.get('id', '')
-                        question_text = question.get('questionText', '')
-                        date_tabled = question.get('dateTabled', '')
-                        uin = question.get('uin', '')
-                        answering_body = question.get('answeringBodyName', '')
-                        member_name = ''
-
-                        # Get member name from asking member object
-                        asking_member = question.get('askingMember', {})
-                        if asking_member:
-                            member_name = asking_member.get('name', asking_member.get('listAs', ''))
-
-                        # CLIENT-SIDE FILTERING: Check if search term appears in question text
-                        if (question_text and len(question_text.strip()) > 30 and question_id and
-                            search_term.lower() in question_text.lower()):
-
-                            # Construct URL for written question
-                            question_url = construct_written_question_url(date_tabled, uin)
-
-                            contribution = {
-                                'id': f"wq_{question_id}",  # Prefix to avoid ID conflicts
-                                'date': date_tabled,
-                                'debate_title': f"Written Question {uin}: {question_text[:50]}...",
-                                'text': question_text,
-                                'full_text': question_text,
-                                'member_name': member_name,
-                                'hansard_section': answering_body,
-                                'search_term': search_term,
-                                'contribution_type': 'Written Question',
-                                'house': 'Commons',
-                                'url': question_url
-                            }
-                            all_results.append(contribution)
-                            questions_found += 1
-
-            elif response.status_code != 404:
-                st.warning(f"Questions API returned status {response.status_code} for written questions")
-
-        except requests.exceptions.Timeout:
-            st.warning(f"Timeout searching Questions API for '{search_term}' - API is slow, continuing")
-            continue
-        except Exception as e:
-            st.warning(f"Error searching Questions API for '{search_term}': {str(e)}")
-
-        # Search Written Statements with better filtering
-        try:
-            statements_url = f"{questions_base_url}/api/writtenstatements/statements"
-            params = {
-                'members': [mp_id],  # Written statements uses array of member IDs
-                'madeWhenFrom': start_date,
-                'madeWhenTo': end_date,
-                'take': 50,  # Get more results to filter client-side
-                'house': 'Commons'
-                # Note: Removing searchTerm from API call and filtering client-side instead
-            }
-
-            response = requests.get(statements_url, params=params, timeout=20)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                if 'results' in data and data['results']:
-                    statements_found = 0
-                    for item in data['results']:
-                        # Stop if we have enough statements for this search term
-                        if statements_found >= 4:
-                            break
-
-                        statement = item.get('value', {})
-
-                        statement_id = statement.get('id', '')
-                        statement_text = statement.get('text', '')
-                        title = statement.get('title', '')
-                        date_made = statement.get('dateMade', '')
-                        uin = statement.get('uin', '')
-                        answering_body = statement.get('answeringBodyName', '')
-                        member_name = ''
-
-                        # Get member name
-                        member = statement.get('member', {})
-                        if member:
-                            member_name = member.get('name', member.get('listAs', ''))
-
-                        # CLIENT-SIDE FILTERING: Check if search term appears in statement text or title
-                        searchable_text = f"{title} {statement_text}".lower()
-                        if (statement_text and len(statement_text.strip()) > 30 and statement_id and
-                            search_term.lower() in searchable_text):
-
-                            # Construct URL for written statement
-                            statement_url = construct_written_statement_url(date_made, uin)
-
-                            contribution = {
-                                'id': f"ws_{statement_id}",  # Prefix to avoid ID conflicts
-                                'date': date_made,
-                                'debate_title': title or f"Written Statement {uin}",
-                                'text': statement_text,
-                                'full_text': statement_text,
-                                'member_name': member_name,
-                                'hansard_section': answering_body,
-                                'search_term': search_term,
-                                'contribution_type': 'Written Statement',
-                                'house': 'Commons',
-                                'url': statement_url
-                            }
-                            all_results.append(contribution)
-                            statements_found += 1
-
-            elif response.status_code != 404:
-                st.warning(f"Questions API returned status {response.status_code} for written statements")
-
-        except requests.exceptions.Timeout:
-            st.warning(f"Timeout searching Questions API statements for '{search_term}' - API is slow, continuing")
-            continue
-        except Exception as e:
-            st.warning(f"Error searching Questions API statements for '{search_term}': {str(e)}")
-
-    # Remove duplicates and sort by date
-    seen_ids = set()
-    unique_results = []
-    for result in all_results:
-        result_id = str(result['id'])
-        if result_id not in seen_ids:
-            seen_ids.add(result_id)
-            unique_results.append(result)
-
-    # Sort by date (most recent first)
-    unique_results.sort(key=lambda x: x['date'], reverse=True)
-
-    return unique_results
-
-
-def construct_written_question_url(date_tabled, uin):
-    """Construct URL for written question based on date and UIN"""
-    if not date_tabled or not uin:
-        return ''
-
-    try:
-        # Parse date and format for URL
-        date_obj = datetime.strptime(date_tabled[:10], '%Y-%m-%d')
-        formatted_date = date_obj.strftime('%Y-%m-%d')
-
-        # Construct URL - this is the typical pattern for written questions
-        return f"https://questions-statements.parliament.uk/written-questions/detail/{formatted_date}/{uin}"
-    except:
-        return ''
-
-
-def construct_written_statement_url(date_made, uin):
-    """Construct URL for written statement based on date and UIN"""
-    if not date_made or not uin:
-        return ''
-
-    try:
-        # Parse date and format for URL
-        date_obj = datetime.strptime(date_made[:10], '%Y-%m-%d')
-        formatted_date = date_obj.strftime('%Y-%m-%d')
-
-        # Construct URL - this is the typical pattern for written statements
-        return f"https://questions-statements.parliament.uk/written-statements/detail/{formatted_date}/{uin}"
-    except:
-        return ''
-
-
+    """
+    Search an MP's parliamentary record, showing any API problems as warnings.
+
+    Answered from the local full-text index once the MP's record for the date
+    range is synced. Until then the remote APIs are searched and a background
+    sync is started, so later searches on the same MP are local.
+    """
+    if hansard_index.covers(mp_id, start_date, end_date):
+        return hansard_index.search(mp_id, search_terms, start_date, end_date, limit=max_results)
+
+    hansard_index.start_sync(mp_id, start_date, end_date)
+    return hansard.search_hansard_contributions(
+        mp_id, search_terms, start_date, end_date, max_results, warn=st.warning
+    )
 
 
 def format_hansard_date(date_string):
@@ -2459,6 +2190,10 @@ def hansard_search_interface(mp_name, mp_id):
     if st.session_state.hansard_search_performed and st.session_state.hansard_results:
         st.subheader(f"📋 Search Results ({len(st.session_state.hansard_results)} found)")
 
+        # Stored links show now; missing ones are requested in the background
+        # and show on the next rerun (or are waited for when added)
+        hansard_links.fill(st.session_state.hansard_results, timeout=0)
+
         # Selection controls
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -2503,8 +2238,8 @@ def hansard_search_interface(mp_name, mp_id):
                 st.markdown(f"**{result_date}** {type_badge} {result['contribution_type']} - {result['debate_title']}")
                 st.caption(f"Found by search term: '{result['search_term']}'")
 
-                # Show contribution text
-                text_to_show = result['full_text'] if result['full_text'] else result['text']
+                # Show contribution text (the matching snippet for local index results)
+                text_to_show = result.get('snippet') or result['full_text'] or result['text']
                 if len(text_to_show) > 500:
                     text_to_show = text_to_show[:500] + "..."
 
@@ -2521,6 +2256,7 @@ def hansard_search_interface(mp_name, mp_id):
         # Add selected items button
         if st.session_state.selected_hansard_items:
             if st.button(f"➕ Add {len(st.session_state.selected_hansard_items)} Selected Items", type="primary"):
+                hansard_links.fill([r for r in st.session_state.hansard_results if r['id'] in st.session_state.selected_hansard_items])
                 new_comments = []
                 for result in st.session_state.hansard_results:
                     if result['id'] in st.session_state.selected_hansard_items:
@@ -2540,11 +2276,20 @@ def hansard_search_interface(mp_name, mp_id):
     return []
 # Cache for API responses to improve performance
 @lru_cache(maxsize=500)
-def cached_search_mps(query, limit=20):
-    """Cached version of MP search - FIXED to only return Commons MPs"""
+def cached_search_mps(query, limit=20, roster_synced_at=0):
+    """Cached version of MP search - FIXED to only return Commons MPs
+
+    roster_synced_at only keys the cache, so results (including API
+    fallbacks from before the first roster sync) are dropped once the
+    roster is resynced.
+    """
     if not query or len(query.strip()) < 2:
         return []
 
+    # Resolve against the local Commons roster; only hit the API before the first sync
+    if mp_roster.is_ready():
+        return tuple(mp_roster.search_roster(query, limit))
+
     try:
         search_url = f"https://members-api.parliament.uk/api/Members/Search"
         params = {
@@ -2553,32 +2298,17 @@ def cached_search_mps(query, limit=20):
             'take': limit * 2  # Get more results to account for filtering
         }
 
-        response = requests.get(search_url, params=params, timeout=3)
+        response = http_client.get(search_url, params=params, timeout=3)
         if response.status_code == 200:
             data = response.json()
 
             mps = []
             if data.get('items'):
                 for item in data['items']:
-                    member = item.get('value', {})
-
-                    # Check if this is a Commons MP (house_id == 1)
-                    latest_membership = member.get('latestHouseMembership', {})
-                    house_id = latest_membership.get('house')
-
-                    # ONLY include Commons MPs (house_id == 1)
-                    if house_id != 1:
-                        continue
-
-                    mp_info = {
-                        'id': member.get('id'),
-                        'name': member.get('nameDisplayAs', ''),
-                        'party': member.get('latestParty', {}).get('name', '') if member.get('latestParty') else '',
-                        'constituency': latest_membership.get('membershipFrom', ''),
-                        'house': 'Commons'  # We know it's Commons since we filtered
-                    }
+                    # ONLY include Commons MPs
+                    mp_info = mp_roster.member_to_mp_info(item.get('value', {}))
 
-                    if mp_info['name'] and mp_info['id'] and mp_info['constituency']:
+                    if mp_info:
                         mps.append(mp_info)
 
                         # Stop when we have enough Commons MPs
@@ -2593,37 +2323,7 @@ def cached_search_mps(query, limit=20):
 
 def search_mps(query, limit=20):
     """Wrapper for cached search that returns list"""
-    return list(cached_search_mps(query, limit))
-
-def normalize_name(name):
-    """Normalize names for better matching"""
-    # Remove titles and honorifics
-    name = name.lower().strip()
-
-    # Remove common titles
-    titles = ['sir', 'dame', 'lord', 'baroness', 'rt hon', 'the rt hon', 'dr', 'prof']
-    for title in titles:
-        if name.startswith(title + ' '):
-            name = name[len(title) + 1:]
-
-    # Remove extra whitespace
-    return ' '.join(name.split())
-
-def calculate_similarity(query, mp_name):
-    """Calculate similarity between query and MP name with normalization"""
-    query_norm = normalize_name(query)
-    mp_name_norm = normalize_name(mp_name)
-
-    # Check for exact match after normalization
-    if query_norm == mp_name_norm:
-        return 1.0
-
-    # Check if query is contained in MP name (for partial matches)
-    if query_norm in mp_name_norm:
-        return 0.95
-
-    # Use sequence matcher for fuzzy matching
-    return SequenceMatcher(None, query_norm, mp_name_norm).ratio()
+    return list(cached_search_mps(query, limit, mp_roster.synced_at()))
 
 def validate_mp_name(query):
     """Enhanced validation - FIXED to always show multiple options when there are several matches"""
@@ -2635,24 +2335,14 @@ def validate_mp_name(query):
             'message': 'Please enter at least 2 characters'
         }
 
-    # Add debouncing
-    if 'last_search_time' not in st.session_state:
-        st.session_state.last_search_time = 0
-
-    current_time = time.time()
-    if current_time - st.session_state.last_search_time < 1.0:
-        return {
-            'is_valid': False,
-            'exact_match': None,
-            'suggestions': [],
-            'message': 'Searching...'
-        }
-
-    st.session_state.last_search_time = current_time
-
-    mps = search_mps(query)
+    if mp_roster.is_ready():
+        # Ranked suggestions straight from the in-memory roster index
+        mp_similarities = mp_search.search(query, limit=40)
+    else:
+        # Roster not synced yet - rank the Members API search results instead
+        mp_similarities = mp_search.rank(query, search_mps(query))
 
-    if not mps:
+    if not mp_similarities:
         return {
             'is_valid': False,
             'exact_match': None,
@@ -2660,15 +2350,6 @@ def validate_mp_name(query):
             'message': f'No MPs found matching "{query}". Please check the spelling and try again.'
         }
 
-    # Calculate similarities for all MPs
-    mp_similarities = []
-    for mp in mps:
-        similarity = calculate_similarity(query, mp['name'])
-        mp_similarities.append((mp, similarity))
-
-    # Sort by similarity
-    mp_similarities.sort(key=lambda x: x[1], reverse=True)
-
     # Get high-quality matches (similarity >= 0.8)
     high_quality_matches = [match for match in mp_similarities if match[1] >= 0.8]
 
@@ -2778,10 +2459,6 @@ def mp_name_input_with_validation():
 
         st.session_state.validation_result = validation_result
 
-        if validation_result['message'] == 'Searching...':
-            st.info("⏳ Searching...")
-            return None
-
         if validation_result['is_valid']:
             st.success(validation_result['message'])
             st.session_state.selected_mp = validation_result['exact_match']
@@ -3076,6 +2753,11 @@ def main_app():
     create_custom_header()
     create_progress_indicator_navigation()
 
+    # Start loading the selected MP's data while the user works through steps 2-3
+    if st.session_state.get('selected_mp'):
+        prefetch.start(st.session_state.selected_mp)
+        hansard_index.start_sync(st.session_state.selected_mp['id'])
+
     # Get current step from session state
     current_step = st.session_state.get('wizard_step', 1)
 
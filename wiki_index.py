@@ -0,0 +1,272 @@
+"""
+Prebuilt index of MP Wikipedia articles from the list-of-MPs pages.
+
+The two list pages are large, so they are downloaded and parsed once, the
+table rows reduced to (link text, article URL, constituency) entries and
+saved to cache/wikipedia_mp_index.json. A background thread rebuilds the
+index daily; lookups are dictionary reads on the normalised MP name.
+"""
+import json
+import os
+import threading
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+import http_client
+from mp_roster import normalize_name
+
+CACHE_DIR = 'cache'
+INDEX_PATH = os.path.join(CACHE_DIR, 'wikipedia_mp_index.json')
+
+WIKIPEDIA_BASE_URL = "https://en.wikipedia.org"
+LIST_URLS = [
+    "https://en.wikipedia.org/wiki/List_of_MPs_elected_in_the_2024_United_Kingdom_general_election",
+    "https://en.wikipedia.org/wiki/List_of_current_members_of_the_British_Parliament"
+]
+
+INDEX_MAX_AGE = 24 * 60 * 60    # rebuild once the saved index is a day old
+REFRESH_CHECK_INTERVAL = 60 * 60
+BUILD_RETRY_INTERVAL = 5 * 60   # minimum gap between on-demand builds that failed
+
+# Links in the list tables that are never an MP's article
+NON_MP_LINK_PATTERNS = ['constituency', 'party', 'election', 'parliament', 'list_of', 'category:']
+
+_index = {'built_at': 0, 'entries': []}
+_by_name = {}
+_loaded = False
+_last_build_attempt = 0
+_load_lock = threading.Lock()
+_build_lock = threading.Lock()
+_refresh_thread = None
+_refresh_thread_lock = threading.Lock()
+
+
+def constituency_variations(constituency):
+    """Lower-cased spellings of a constituency name ('and' vs '&')"""
+    constituency_lower = constituency.lower()
+    return [
+        constituency_lower,
+        constituency_lower.replace(' and ', ' & '),
+        constituency_lower.replace(' & ', ' and '),
+    ]
+
+
+def constituency_matches(constituency, text):
+    """True if any spelling of the constituency appears in the text"""
+    text = text.lower()
+    return any(variation in text for variation in constituency_variations(constituency))
+
+
+def parse_list_page(html):
+    """
+    Reduce a list-of-MPs page to index entries.
+
+    Only wikitable tables are parsed. Every article link in a row is kept,
+    tagged with the row's constituency link text where there is one.
+
+    Returns:
+        list: dicts with 'name', 'url' and 'constituency'
+    """
+    # Only build a tree for the tables, not the whole article
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('table'))
+    entries = []
+
+    rows = [row for table in soup.find_all('table', class_='wikitable') for row in table.find_all('tr')]
+    for row in rows:
+        constituency = ''
+        people = []
+        for link in row.find_all('a'):
+            href = link.get('href', '')
+            if not href.startswith('/wiki/'):
+                continue
+            href_lower = href.lower()
+            if 'constituency' in href_lower and not constituency:
+                constituency = link.get_text().strip()
+                continue
+            if any(x in href_lower for x in NON_MP_LINK_PATTERNS) or ':' in href[6:]:
+                continue
+            text = link.get_text().strip()
+            if text:
+                people.append((text, f"{WIKIPEDIA_BASE_URL}{href}"))
+
+        for text, url in people:
+            entries.append({'name': text, 'url': url, 'constituency': constituency})
+
+    return entries
+
+
+def build_index():
+    """
+    Download and parse the list pages and save the index locally.
+
+    The existing index is kept if no page could be fetched, or if it is
+    still fresh once the lock is acquired (another caller just built it).
+
+    Returns:
+        bool: True if the index was replaced
+    """
+    global _index, _by_name, _loaded, _last_build_attempt
+
+    with _build_lock:
+        if _index['entries'] and not is_stale():
+            return False
+        _last_build_attempt = time.time()
+        started = time.monotonic()
+        entries = []
+        seen = set()
+        fetched = 0
+
+        for list_url in LIST_URLS:
+            try:
+                response = http_client.get(list_url)
+                if response.status_code != 200:
+                    print(f"Error fetching {list_url}: status {response.status_code}")
+                    continue
+                fetched += 1
+                for entry in parse_list_page(response.text):
+                    key = (entry['url'], entry['constituency'])
+                    if key not in seen:
+                        seen.add(key)
+                        entries.append(entry)
+            except Exception as e:
+                print(f"Error indexing {list_url}: {str(e)}")
+
+        if not fetched:
+            return False
+
+        new_index = {'built_at': time.time(), 'entries': entries}
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = INDEX_PATH + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(new_index, f)
+            os.replace(tmp_path, INDEX_PATH)
+        except Exception as e:
+            print(f"Error saving Wikipedia index: {str(e)}")
+
+        _index = new_index
+        _by_name = _group_by_name(entries)
+        _loaded = True
+        print(f"Wikipedia MP index built: {len(entries)} entries in {time.monotonic() - started:.1f}s")
+        return True
+
+
+def _group_by_name(entries):
+    by_name = {}
+    for entry in entries:
+        by_name.setdefault(normalize_name(entry['name']), []).append(entry)
+    return by_name
+
+
+def _load_from_disk():
+    """Load the saved index once per process"""
+    global _index, _by_name, _loaded
+
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        try:
+            if os.path.exists(INDEX_PATH):
+                with open(INDEX_PATH) as f:
+                    _index = json.load(f)
+                _by_name = _group_by_name(_index['entries'])
+                print(f"Loaded Wikipedia MP index of {len(_index['entries'])} entries from disk")
+        except Exception as e:
+            print(f"Error loading Wikipedia index: {str(e)}")
+        _loaded = True
+
+
+def is_stale():
+    _load_from_disk()
+    return time.time() - _index['built_at'] > INDEX_MAX_AGE
+
+
+def is_ready():
+    """True once there is an index to look names up in"""
+    _load_from_disk()
+    return bool(_index['entries'])
+
+
+def get_entries():
+    """
+    All index entries, building the index now if there is none yet.
+
+    If a build is already running (e.g. the refresh thread's first build on
+    a cold start), waits for it rather than returning an empty index.
+    """
+    _load_from_disk()
+    if not _index['entries']:
+        if _build_lock.locked():
+            with _build_lock:
+                pass
+        elif time.time() - _last_build_attempt > BUILD_RETRY_INTERVAL:
+            build_index()
+    return _index['entries']
+
+
+def lookup(mp_name, constituency=None):
+    """
+    Entries whose link text is exactly the MP's name.
+
+    With a constituency, only entries from that constituency's row are
+    returned - a name and seat match in the list table needs no further
+    verification.
+    """
+    get_entries()
+    entries = _by_name.get(normalize_name(mp_name), [])
+    if constituency:
+        entries = [e for e in entries if e['constituency'] and constituency_matches(constituency, e['constituency'])]
+    return entries
+
+
+def find_candidates(mp_name, min_surname_length=0):
+    """
+    Candidate articles for an MP by link text, best first.
+
+    Matches the full name, first and last name together, or the surname
+    alone if it is longer than min_surname_length; exact name matches come
+    first. Each URL appears once.
+    """
+    name_lower = mp_name.lower()
+    name_parts = name_lower.split()
+    first_name = name_parts[0] if name_parts else ""
+    last_name = name_parts[-1] if name_parts else ""
+
+    exact = []
+    partial = []
+    seen = set()
+    for entry in get_entries():
+        if entry['url'] in seen:
+            continue
+        link_text = entry['name'].lower()
+        if (name_lower in link_text or
+            (first_name in link_text and last_name in link_text) or
+            (last_name in link_text and len(last_name) > min_surname_length)):
+            seen.add(entry['url'])
+            (exact if link_text == name_lower else partial).append(entry)
+
+    return exact + partial
+
+
+def _refresh_loop():
+    while True:
+        if is_stale():
+            build_index()
+        time.sleep(REFRESH_CHECK_INTERVAL)
+
+
+def start_background_refresh():
+    """Start the index refresh thread once per process (safe to call on every rerun)"""
+    global _refresh_thread
+
+    # Not _build_lock: build_index holds it for a whole build, and this runs on every rerun
+    if _refresh_thread is not None:
+        return
+    with _refresh_thread_lock:
+        if _refresh_thread is not None:
+            return
+        _refresh_thread = threading.Thread(target=_refresh_loop, name='wiki_index_refresh', daemon=True)
+        _refresh_thread.start()
@@ -0,0 +1,383 @@
+"""
+Memoised Wikipedia resolution for an MP.
+
+resolve() finds the MP's article (verified against the constituency when
+one is given), loads it once and returns a WikiResult holding the URL, page
+title, section table, revision id and how confident the match is. Results
+are memoised per MP so the prefetch, generate_biography and save_biography
+all share a single resolution.
+
+Articles are fetched with a single MediaWiki API request (plain-text extract
+with section headings plus revision and URL info) through http_client's
+pooled session, and parsed locally into summary and sections. Fetched pages
+are kept briefly, so a candidate downloaded for constituency verification is
+not downloaded again when it is loaded.
+"""
+import re
+import threading
+import time
+from urllib.parse import unquote
+
+import http_client
+import wiki_index
+from mp_roster import normalize_name
+
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+
+# Candidate pages checked concurrently for the constituency
+MAX_WIKI_CANDIDATES = 10
+
+# Match confidence
+LIST_MATCH_CONFIDENCE = 1.0     # name and constituency in the same list-table row
+EXTRACT_MATCH_CONFIDENCE = 0.9  # constituency found in the article text
+NAME_ONLY_CONFIDENCE = 0.5      # name match only, constituency not checked
+
+# Wikipedia share of the prompt, in tokens (about the old 3500 characters)
+DEFAULT_TOKEN_BUDGET = 900
+
+# Rough token estimate for English prose; avoids a tokenizer round trip
+CHARS_PER_TOKEN = 4
+
+RESULT_TTL = 6 * 60 * 60        # seconds a resolved page is reused
+NOT_FOUND_TTL = 10 * 60         # seconds a failed resolution is reused
+PAGE_TTL = 10 * 60              # seconds a fetched article is reused
+
+# Section headings in an extract fetched with exsectionformat=wiki
+HEADING_PATTERN = re.compile(r'^(={2,6})\s*(.+?)\s*\1\s*$', re.MULTILINE)
+
+# Biographical relevance by section title keyword, most specific first; the
+# first keyword found in a title sets its score
+SECTION_RELEVANCE = [
+    ('early life', 1.0),
+    ('education', 0.95),
+    ('personal life', 0.9),
+    ('background', 0.9),
+    ('political career', 0.9),
+    ('parliamentary career', 0.9),
+    ('career', 0.85),
+    ('political views', 0.8),
+    ('controversies', 0.7),
+    ('awards', 0.6),
+    ('publications', 0.5),
+]
+OTHER_SECTION_RELEVANCE = 0.3
+SUBSECTION_FACTOR = 0.8         # subsections rank a little below their parent
+
+SKIPPED_SECTIONS = ['see also', 'references', 'external links', 'notes', 'bibliography', 'further reading']
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def section_relevance(title):
+    """Biographical relevance of a section title, 0 for sections never worth including"""
+    title_lower = title.lower()
+    if any(x in title_lower for x in SKIPPED_SECTIONS):
+        return 0.0
+    for keyword, score in SECTION_RELEVANCE:
+        if keyword in title_lower:
+            return score
+    return OTHER_SECTION_RELEVANCE
+
+
+_pages = {}     # title -> (expires_at, page dict or None)
+_pages_lock = threading.Lock()  # fetch_page runs on several verification threads at once
+_results = {}   # (normalised name, constituency) -> (expires_at, WikiResult or None)
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+class WikiResult:
+    """A resolved Wikipedia article for an MP"""
+
+    def __init__(self, url, title, summary, sections, revid, confidence):
+        self.url = url
+        self.title = title
+        self.summary = summary
+        self.sections = sections        # dicts with 'title', 'text' and 'parent'
+        self.revid = revid
+        self.confidence = confidence
+        self._section_table = None
+
+    def __repr__(self):
+        return f"WikiResult({self.title!r}, revid={self.revid}, confidence={self.confidence})"
+
+    @property
+    def section_table(self):
+        """
+        Every usable section measured and scored once, best first.
+
+        Entries are dicts with 'index' (document order), 'block' (heading and
+        text as they appear in the prompt), 'tokens' and 'score'.
+        """
+        if self._section_table is None:
+            parent_scores = {}
+            table = []
+            for index, section in enumerate(self.sections):
+                if not section['text'].strip():
+                    # Keep the heading's score for its subsections
+                    if section['parent'] is None:
+                        parent_scores[section['title']] = section_relevance(section['title'])
+                    continue
+
+                score = section_relevance(section['title'])
+                if section['parent'] is None:
+                    parent_scores[section['title']] = score
+                    heading = section['title']
+                else:
+                    parent_score = parent_scores.get(section['parent'], OTHER_SECTION_RELEVANCE)
+                    if parent_score == 0:
+                        continue
+                    score = max(score, parent_score) * SUBSECTION_FACTOR
+                    heading = f"{section['parent']} - {section['title']}"
+
+                if score > 0:
+                    block = f"{heading}\n{section['text']}"
+                    table.append({'index': index, 'block': block, 'tokens': estimate_tokens(block), 'score': score})
+
+            table.sort(key=lambda entry: (-entry['score'], entry['index']))
+            self._section_table = table
+        return self._section_table
+
+    def build_content(self, max_tokens=DEFAULT_TOKEN_BUDGET):
+        """
+        Summary plus the most relevant sections that fit in a token budget.
+
+        One pass over the precomputed section table, best first, taking every
+        section that still fits; the chosen sections are emitted in document
+        order.
+        """
+        remaining = max_tokens - estimate_tokens(self.summary)
+        chosen = []
+        for entry in self.section_table:
+            if entry['tokens'] <= remaining:
+                chosen.append(entry)
+                remaining -= entry['tokens']
+
+        chosen.sort(key=lambda entry: entry['index'])
+        return '\n\n'.join([self.summary] + [entry['block'] for entry in chosen])
+
+    @property
+    def content(self):
+        return self.build_content()
+
+
+def wiki_title_from_url(page_url):
+    """Article title from an en.wikipedia.org/wiki/... URL"""
+    return unquote(page_url.split('/wiki/', 1)[-1]).replace('_', ' ')
+
+
+def parse_extract(extract):
+    """
+    Split a plain-text extract into its summary and a flat section list.
+
+    Level-2 headings are top-level sections; deeper headings become
+    subsections of the level-2 section they sit under.
+
+    Returns:
+        tuple: (summary, sections) with sections as dicts with 'title',
+        'text' and 'parent'
+    """
+    headings = list(HEADING_PATTERN.finditer(extract))
+    summary = extract[:headings[0].start()].strip() if headings else extract.strip()
+
+    sections = []
+    parent = None
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(extract)
+        title = heading.group(2)
+        text = extract[heading.end():end].strip()
+        if len(heading.group(1)) == 2:
+            parent = title
+            sections.append({'title': title, 'text': text, 'parent': None})
+        else:
+            sections.append({'title': title, 'text': text, 'parent': parent})
+
+    return summary, sections
+
+
+def fetch_page(page_url):
+    """
+    Fetch an article in one request: plain-text extract, latest revision id
+    and canonical URL. Redirects are followed.
+
+    Returns:
+        dict with 'title', 'url', 'revid' and 'extract', or None if the page
+        doesn't exist
+    """
+    title = wiki_title_from_url(page_url)
+    with _pages_lock:
+        cached = _pages.get(title)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
+    params = {
+        'action': 'query',
+        'prop': 'extracts|info',
+        'explaintext': 1,
+        'exsectionformat': 'wiki',
+        'inprop': 'url',
+        'redirects': 1,
+        'titles': title,
+        'format': 'json',
+        'formatversion': 2
+    }
+    response = http_client.get(WIKIPEDIA_API_URL, params=params)
+    if response.status_code != 200:
+        return None
+
+    pages = response.json().get('query', {}).get('pages', [])
+    if not pages or pages[0].get('missing'):
+        page = None
+    else:
+        page = {
+            'title': pages[0].get('title', title),
+            'url': pages[0].get('canonicalurl', page_url),
+            'revid': pages[0].get('lastrevid'),
+            'extract': pages[0].get('extract') or ''
+        }
+
+    now = time.time()
+    with _pages_lock:
+        for expired in [t for t, (expires_at, _) in _pages.items() if expires_at <= now]:
+            del _pages[expired]
+        _pages[title] = (now + PAGE_TTL, page)
+    return page
+
+
+def get_wiki_plaintext(page_url):
+    """Plain-text extract of a Wikipedia article, or None if it doesn't exist"""
+    page = fetch_page(page_url)
+    return page['extract'] if page else None
+
+
+def verify_constituency_in_wikipedia(page_url, constituency):
+    """
+    Simple verification: check if constituency appears in Wikipedia page content
+    Returns True if constituency is mentioned, False otherwise
+    """
+    try:
+        content = get_wiki_plaintext(page_url)
+        if not content:
+            return False
+
+        # Check for constituency (handle common variations)
+        return wiki_index.constituency_matches(constituency, content)
+
+    except Exception as e:
+        print(f"Error verifying constituency: {str(e)}")
+        return False
+
+
+def find_page(mp_name, constituency=None):
+    """
+    Find an MP's Wikipedia article.
+
+    With a constituency, a name and seat match in the list index is accepted
+    as is; otherwise candidate pages are checked for the constituency
+    concurrently and the best-ranked confirmed candidate wins. Without one,
+    the best name match is returned unverified.
+
+    Returns:
+        tuple: (url, confidence), or (None, 0) if nothing matched
+    """
+    if not constituency:
+        candidates = wiki_index.find_candidates(mp_name)
+        if candidates:
+            print(f"Using best name match: {candidates[0]['name']} - {candidates[0]['url']}")
+            return candidates[0]['url'], NAME_ONLY_CONFIDENCE
+        print(f"No matches found for {mp_name}")
+        return None, 0
+
+    print(f"Searching for Wikipedia page: {mp_name} (constituency: {constituency})")
+
+    # Name and seat in the same list-table row
+    matches = wiki_index.lookup(mp_name, constituency)
+    if matches:
+        print(f"✅ VERIFIED from list index: {matches[0]['name']} -> {matches[0]['url']}")
+        return matches[0]['url'], LIST_MATCH_CONFIDENCE
+
+    potential_matches = wiki_index.find_candidates(mp_name, min_surname_length=4)[:MAX_WIKI_CANDIDATES]
+    print(f"Found {len(potential_matches)} potential Wikipedia matches")
+
+    # Check every candidate at once, then take results in rank order
+    futures = [
+        http_client.submit(verify_constituency_in_wikipedia, match['url'], constituency)
+        for match in potential_matches
+    ]
+    try:
+        for match, future in zip(potential_matches, futures):
+            if future.result():
+                print(f"✅ VERIFIED: Constituency '{constituency}' found in {match['name']} -> {match['url']}")
+                return match['url'], EXTRACT_MATCH_CONFIDENCE
+            print(f"❌ REJECTED: Constituency '{constituency}' not found in {match['name']}")
+    finally:
+        for future in futures:
+            future.cancel()
+
+    print(f"❌ No verified Wikipedia page found for {mp_name} in {constituency}")
+    return None, 0
+
+
+def load_page(url, confidence):
+    """Load an article into a WikiResult, or None if it doesn't exist"""
+    page = fetch_page(url)
+    if not page:
+        print(f"Page does not exist in Wikipedia API: {wiki_title_from_url(url)}")
+        return None
+
+    summary, sections = parse_extract(page['extract'])
+    return WikiResult(
+        url=url,
+        title=page['title'],
+        summary=summary,
+        sections=sections,
+        revid=page['revid'],
+        confidence=confidence
+    )
+
+
+def resolve(mp_name, constituency=None):
+    """
+    Resolve and load an MP's Wikipedia article, memoised per MP.
+
+    Returns:
+        WikiResult or None
+    """
+    key = (normalize_name(mp_name), (constituency or '').lower())
+
+    cached = _results.get(key)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
+    with _locks_guard:
+        lock = _locks.setdefault(key, threading.Lock())
+
+    with lock:
+        cached = _results.get(key)
+        if cached and cached[0] > time.time():
+            return cached[1]
+
+        result = None
+        try:
+            url, confidence = find_page(mp_name, constituency)
+            if url:
+                result = load_page(url, confidence)
+        except Exception as e:
+            print(f"Error resolving Wikipedia page for {mp_name}: {str(e)}")
+
+        # A miss against an empty index (no build has succeeded yet) says
+        # nothing about the MP, so only memoise misses once there is one
+        if result or wiki_index.is_ready():
+            ttl = RESULT_TTL if result else NOT_FOUND_TTL
+            _results[key] = (time.time() + ttl, result)
+        if result:
+            print(f"Resolved Wikipedia page for {mp_name}: {result}")
+        return result
+
+
+def clear_cache():
+    _results.clear()
+    with _pages_lock:
+        _pages.clear()
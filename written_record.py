@@ -0,0 +1,249 @@
+"""
+Local copy of an MP's written questions and written statements.
+
+The Questions & Statements API can't be searched by term, and a single
+request only returns one page of records. sync() harvests the complete set
+for an MP and date range - the first page gives the total, the remaining
+pages are fetched concurrently with skip/take - and stores the raw records
+in SQLite. Coverage is recorded per MP and feed, so later syncs only fetch
+the dates not yet covered plus a short overlap at the recent end to pick up
+new and updated records.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import http_client
+
+CACHE_DIR = 'cache'
+CACHE_DB_PATH = os.path.join(CACHE_DIR, 'written_record.sqlite3')
+
+QUESTIONS_BASE_URL = "https://questions-statements-api.parliament.uk"
+
+# Feed name -> how to request it and where its date lives
+FEEDS = {
+    'written_questions': {
+        'url': f"{QUESTIONS_BASE_URL}/api/writtenquestions/questions",
+        'member_param': 'askingMemberId',
+        'from_param': 'tabledWhenFrom',
+        'to_param': 'tabledWhenTo',
+        'date_field': 'dateTabled'
+    },
+    'written_statements': {
+        'url': f"{QUESTIONS_BASE_URL}/api/writtenstatements/statements",
+        'member_param': 'members',
+        'from_param': 'madeWhenFrom',
+        'to_param': 'madeWhenTo',
+        'date_field': 'dateMade'
+    }
+}
+
+PAGE_SIZE = 50                  # records per request
+HARVEST_DEADLINE = 20           # seconds for all pages of one date range
+SYNC_INTERVAL = 6 * 60 * 60     # recheck the recent end of a covered range this often
+SYNC_OVERLAP_DAYS = 2           # re-fetch this many days before the covered end
+
+# Separate from http_client's pool: a sync blocks while its page requests
+# run on that pool
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='written_record')
+
+_local = threading.local()
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _connection():
+    """One SQLite connection per thread (sqlite3 connections can't be shared)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                feed TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                member_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (feed, record_id)
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS records_by_member ON records (member_id, feed, day)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS coverage (
+                feed TEXT NOT NULL,
+                member_id TEXT NOT NULL,
+                covered_from TEXT NOT NULL,
+                covered_to TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (feed, member_id)
+            )
+        """)
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def _shift_day(day, days):
+    """YYYY-MM-DD moved by a number of days"""
+    return (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def _page_params(feed, mp_id, start_date, end_date, skip):
+    config = FEEDS[feed]
+    member = [mp_id] if config['member_param'] == 'members' else mp_id
+    return {
+        config['member_param']: member,
+        config['from_param']: start_date,
+        config['to_param']: end_date,
+        'skip': skip,
+        'take': PAGE_SIZE,
+        'house': 'Commons'
+    }
+
+
+def harvest(feed, mp_id, start_date, end_date, deadline=HARVEST_DEADLINE, executor=None):
+    """
+    Fetch every record of a feed for an MP and date range.
+
+    Pages after the first run on `executor` if given (background syncs pass
+    their own pool), otherwise on http_client's shared pool.
+
+    Returns:
+        tuple: (records, complete) with records as the API's 'value' dicts,
+        complete False if any page failed or missed the deadline
+    """
+    url = FEEDS[feed]['url']
+    response = http_client.get(url, params=_page_params(feed, mp_id, start_date, end_date, 0))
+    if response.status_code != 200:
+        print(f"Error harvesting {feed} for {mp_id}: status {response.status_code}")
+        return [], False
+
+    data = response.json()
+    records = [item.get('value', {}) for item in data.get('results') or []]
+    total = data.get('totalResults', len(records))
+
+    pages = {
+        skip: (url, {'params': _page_params(feed, mp_id, start_date, end_date, skip)})
+        for skip in range(PAGE_SIZE, total, PAGE_SIZE)
+    }
+    responses, missing = http_client.fetch_all(pages, deadline, executor=executor) if pages else ({}, [])
+
+    for skip in sorted(responses):
+        if responses[skip].status_code == 200:
+            records.extend(item.get('value', {}) for item in responses[skip].json().get('results') or [])
+        else:
+            missing.append(skip)
+
+    print(f"Harvested {len(records)}/{total} {feed} for {mp_id} ({start_date} to {end_date}) in {1 + len(pages)} pages")
+    return records, not missing
+
+
+def _store(feed, mp_id, records):
+    date_field = FEEDS[feed]['date_field']
+    rows = [
+        (feed, str(record['id']), str(mp_id), (record.get(date_field) or '')[:10], json.dumps(record))
+        for record in records if record.get('id')
+    ]
+    conn = _connection()
+    with conn:
+        conn.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)', rows)
+
+
+def ranges_to_fetch(coverage, start_date, end_date):
+    """Date ranges not yet covered, plus the recent end once it's due a recheck"""
+    if coverage is None:
+        return [(start_date, end_date)]
+
+    covered_from, covered_to, synced_at = coverage
+    ranges = []
+    if start_date < covered_from:
+        ranges.append((start_date, covered_from))
+    if end_date > covered_to or time.time() - synced_at > SYNC_INTERVAL:
+        ranges.append((max(covered_from, _shift_day(covered_to, -SYNC_OVERLAP_DAYS)), max(end_date, covered_to)))
+    return ranges
+
+
+def sync(feed, mp_id, start_date, end_date, executor=None):
+    """
+    Bring the local copy of a feed up to date for an MP and date range.
+
+    Coverage only grows when every page of a range arrived, so an
+    interrupted harvest is retried on the next sync. `executor` is passed
+    on to harvest().
+
+    Returns:
+        bool: True if the range is fully covered
+    """
+    key = (feed, str(mp_id))
+    with _locks_guard:
+        lock = _locks.setdefault(key, threading.Lock())
+
+    with lock:
+        conn = _connection()
+        coverage = conn.execute(
+            'SELECT covered_from, covered_to, synced_at FROM coverage WHERE feed = ? AND member_id = ?', key
+        ).fetchone()
+
+        complete = True
+        for range_start, range_end in ranges_to_fetch(coverage, start_date, end_date):
+            records, range_complete = harvest(feed, mp_id, range_start, range_end, executor=executor)
+            _store(feed, mp_id, records)
+            if not range_complete:
+                complete = False
+                continue
+
+            if coverage is None:
+                coverage = (range_start, range_end, time.time())
+            else:
+                coverage = (min(coverage[0], range_start), max(coverage[1], range_end), time.time())
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?, ?)', key + coverage)
+
+        return complete
+
+
+def get_records(feed, mp_id, start_date, end_date):
+    """Stored records of a feed for an MP and date range, most recent first"""
+    rows = _connection().execute(
+        'SELECT body FROM records WHERE member_id = ? AND feed = ? AND day BETWEEN ? AND ? ORDER BY day DESC',
+        (str(mp_id), feed, start_date, end_date)
+    ).fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+
+def load_feed(feed, mp_id, start_date, end_date):
+    """
+    Sync, then return the feed in the API's response shape
+    ({'results': [{'value': ...}]}) so it parses like a live response.
+
+    If the sync is incomplete, whatever is stored is still returned.
+    """
+    try:
+        if not sync(feed, mp_id, start_date, end_date):
+            print(f"Incomplete {feed} sync for {mp_id}, using stored records")
+    except Exception as e:
+        print(f"Error syncing {feed} for {mp_id}: {str(e)}")
+    return {'results': [{'value': record} for record in get_records(feed, mp_id, start_date, end_date)]}
+
+
+def submit_load(feed, mp_id, start_date, end_date):
+    """load_feed on this module's worker pool; returns its Future"""
+    return _executor.submit(load_feed, feed, mp_id, start_date, end_date)
+
+
+def invalidate(mp_id=None):
+    """Drop stored records and coverage for one MP, or everything"""
+    conn = _connection()
+    with conn:
+        if mp_id is None:
+            conn.execute('DELETE FROM records')
+            conn.execute('DELETE FROM coverage')
+        else:
+            conn.execute('DELETE FROM records WHERE member_id = ?', (str(mp_id),))
+            conn.execute('DELETE FROM coverage WHERE member_id = ?', (str(mp_id),))